@@ -0,0 +1,133 @@
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from app.parallel import ANALYZE_CHUNK_SIZE, get_worker_analyzer, imap_ordered
+
+AUDIT_FORMATS = ("jsonl", "csv")
+CSV_FIELDS = ["line", "length", "score", "crack_time_seconds", "patterns", "breached"]
+
+# Upper bounds (in seconds) of the crack-time histogram buckets.
+CRACK_TIME_BUCKETS = [
+    ("< 1 second", 1),
+    ("< 1 minute", 60),
+    ("< 1 hour", 3600),
+    ("< 1 day", 86400),
+    ("< 1 month", 2592000),
+    ("< 1 year", 31536000),
+    ("< 100 years", 3153600000),
+    (">= 100 years", float("inf")),
+]
+
+
+def iter_passwords(source: str) -> Iterator[Tuple[int, str]]:
+    """Yield ``(line_number, password)`` from a file or stdin (``-``), one line at a time."""
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8", errors="replace")
+    try:
+        for number, line in enumerate(stream, start=1):
+            password = line.rstrip("\r\n")
+            if password:
+                yield number, password
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _analyze_chunk(
+    chunk: List[Tuple[int, str]],
+    breach_index_path: Optional[str] = None,
+    bloom_filter_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Analyze one chunk of numbered passwords in a worker process."""
+    analyzer = get_worker_analyzer(breach_index_path, bloom_filter_path)
+    records = []
+    for number, password in chunk:
+        analysis = analyzer.analyze(password)
+        records.append(
+            {
+                "line": number,
+                "length": len(password),
+                "score": analysis.score,
+                "crack_time_seconds": analysis.crack_time_seconds,
+                "patterns": analysis.patterns_found,
+                "breached": analysis.breached,
+            }
+        )
+    return records
+
+
+def _chunks(items: Iterator, size: int, *args) -> Iterator[Tuple]:
+    """Group an iterator into ``(chunk, *args)`` task tuples of ``size`` items."""
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield (chunk, *args)
+
+
+def audit_passwords(
+    source: str,
+    workers: int = 1,
+    chunk_size: int = ANALYZE_CHUNK_SIZE,
+    breach_index_path: Optional[str] = None,
+    bloom_filter_path: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream strength results for every password in ``source``, in input order."""
+    tasks = _chunks(iter_passwords(source), chunk_size, breach_index_path, bloom_filter_path)
+    if workers > 1:
+        yield from imap_ordered(_analyze_chunk, tasks, workers)
+    else:
+        for task in tasks:
+            yield from _analyze_chunk(*task)
+
+
+class AuditSummary:
+    """Aggregate score and crack-time histograms over an audit."""
+
+    def __init__(self):
+        self.total = 0
+        self.scores = {score: 0 for score in range(5)}
+        self.crack_times = {label: 0 for label, _ in CRACK_TIME_BUCKETS}
+        self.breached = 0
+
+    def add(self, record: Dict[str, Any]):
+        """Count one audit record."""
+        self.total += 1
+        self.scores[record["score"]] += 1
+        if record.get("breached"):
+            self.breached += 1
+        for label, bound in CRACK_TIME_BUCKETS:
+            if record["crack_time_seconds"] < bound:
+                self.crack_times[label] += 1
+                break
+
+
+class AuditWriter:
+    """Write audit records as JSONL or CSV."""
+
+    def __init__(self, stream: TextIO, fmt: str = "jsonl"):
+        if fmt not in AUDIT_FORMATS:
+            raise ValueError(
+                f"Unknown audit format '{fmt}'. Choose from: {', '.join(AUDIT_FORMATS)}"
+            )
+        self.stream = stream
+        self.fmt = fmt
+        self._csv: Optional[csv.DictWriter] = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]):
+        """Write one record."""
+        if self._csv is not None:
+            self._csv.writerow(
+                {
+                    **record,
+                    "patterns": ";".join(record["patterns"]),
+                    "breached": "" if record["breached"] is None else record["breached"],
+                }
+            )
+        else:
+            self.stream.write(json.dumps(record) + "\n")
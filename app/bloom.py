@@ -0,0 +1,161 @@
+import hashlib
+import math
+import mmap
+import os
+import secrets
+import struct
+import sys
+from typing import Dict, Iterator, Optional
+
+# Filter file layout: a 24-byte header followed by the bit array.
+FILTER_MAGIC = b"CSBF"
+FILTER_VERSION = 1
+HEADER = struct.Struct("<4sBBBxQQ")
+FLAG_CASEFOLD = 1
+
+DEFAULT_FP_RATE = 0.001
+
+
+def filter_parameters(capacity: int, fp_rate: float):
+    """Return ``(bits, hashes)`` for a Bloom filter holding ``capacity`` items at ``fp_rate``."""
+    if not 0 < fp_rate < 1:
+        raise ValueError("False-positive rate must be between 0 and 1")
+    capacity = max(1, capacity)
+    bits = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, min(hashes, 255)
+
+
+def _positions(password: str, casefold: bool, hashes: int, bits: int) -> Iterator[int]:
+    """Yield the bit positions of a password (Kirsch-Mitzenmacher double hashing)."""
+    if casefold:
+        password = password.casefold()
+    digest = hashlib.blake2b(password.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    for i in range(hashes):
+        yield (h1 + i * h2) % bits
+
+
+def _iter_lines(source: str) -> Iterator[str]:
+    """Yield non-empty lines from a file or stdin (``-``)."""
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8", errors="replace")
+    try:
+        for line in stream:
+            line = line.rstrip("\r\n")
+            if line:
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def build_bloom_filter(
+    source: str,
+    output: str,
+    fp_rate: float = DEFAULT_FP_RATE,
+    capacity: Optional[int] = None,
+    casefold: bool = False,
+) -> int:
+    """Stream a password list into a Bloom filter file and return the item count.
+
+    The filter is sized from ``capacity``; when it is not given, ``source``
+    is read once to count its lines (stdin needs an explicit capacity). Bits
+    are set through a writable mmap of the output, so the list is never
+    held in memory.
+    """
+    if capacity is None:
+        if source == "-":
+            raise ValueError("A capacity is required when reading the list from stdin")
+        capacity = sum(1 for _ in _iter_lines(source))
+    bits, hashes = filter_parameters(capacity, fp_rate)
+    flags = FLAG_CASEFOLD if casefold else 0
+
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(FILTER_MAGIC, FILTER_VERSION, flags, hashes, bits, 0))
+        f.truncate(HEADER.size + (bits + 7) // 8)
+
+    count = 0
+    with open(output, "r+b") as f:
+        data = mmap.mmap(f.fileno(), 0)
+        try:
+            base = HEADER.size
+            for password in _iter_lines(source):
+                for position in _positions(password, casefold, hashes, bits):
+                    index = base + (position >> 3)
+                    data[index] |= 1 << (position & 7)
+                count += 1
+            data[:HEADER.size] = HEADER.pack(FILTER_MAGIC, FILTER_VERSION, flags, hashes, bits, count)
+            data.flush()
+        finally:
+            data.close()
+    return count
+
+
+class BloomFilter:
+    """Memory-mapped Bloom filter of compromised or banned passwords."""
+
+    def __init__(self, path: str):
+        """Open a filter built by ``build_bloom_filter``."""
+        self.path = path
+        self._file = open(path, "rb")
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a Bloom filter")
+        magic, version, flags, self.hashes, self.bits, self.count = HEADER.unpack(header)
+        if magic != FILTER_MAGIC or version != FILTER_VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a Bloom filter")
+        self.casefold = bool(flags & FLAG_CASEFOLD)
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def contains(self, password: str) -> bool:
+        """Return True if the password may be in the list (False is definite)."""
+        # Inlined ``_positions``: this is on the hot path of bulk generation
+        if self.casefold:
+            password = password.casefold()
+        digest = hashlib.blake2b(password.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        data = self._mmap
+        base = HEADER.size
+        bits = self.bits
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            if not data[base + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def expected_fp_rate(self) -> float:
+        """Theoretical false-positive rate for the number of items stored."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def measure_fp_rate(self, samples: int = 100000) -> float:
+        """Measure the false-positive rate on random passwords that are not in the list."""
+        hits = sum(self.contains(secrets.token_urlsafe(16)) for _ in range(samples))
+        return hits / samples
+
+    def stats(self) -> Dict[str, float]:
+        """Describe the filter's size and load."""
+        return {
+            "items": self.count,
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "size_bytes": os.path.getsize(self.path),
+            "expected_fp_rate": self.expected_fp_rate(),
+        }
+
+    def close(self):
+        """Unmap and close the filter file."""
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
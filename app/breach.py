@@ -0,0 +1,317 @@
+import binascii
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+# Index file layout: a 16-byte header followed by ``count`` sorted,
+# de-duplicated, fixed-width hash prefixes.
+INDEX_MAGIC = b"CSBX"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sBBBxQ")
+
+ALGORITHMS = {"sha1": 1, "ntlm": 2}
+DIGEST_SIZES = {"sha1": 20, "ntlm": 16}
+
+# 8-byte prefixes keep the index compact; with 1e9 entries the chance of a
+# random password colliding with a prefix is still below 1e-10.
+DEFAULT_PREFIX_BYTES = 8
+SORT_CHUNK_RECORDS = 1_000_000
+# Most sorted runs open at once while merging; more are merged in passes so a
+# HIBP-sized dump (~900 runs) stays well under the usual 1024-descriptor limit.
+MERGE_FAN_IN = 64
+
+
+def _md4(data: bytes) -> bytes:
+    """Pure-Python MD4, used when OpenSSL no longer provides it."""
+    mask = 0xFFFFFFFF
+
+    def rotl(x, n):
+        x &= mask
+        return ((x << n) | (x >> (32 - n))) & mask
+
+    rounds = [
+        (lambda x, y, z: (x & y) | (~x & z), list(range(16)), (3, 7, 11, 19), 0),
+        (
+            lambda x, y, z: (x & y) | (x & z) | (y & z),
+            [0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15],
+            (3, 5, 9, 13),
+            0x5A827999,
+        ),
+        (
+            lambda x, y, z: x ^ y ^ z,
+            [0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15],
+            (3, 9, 11, 15),
+            0x6ED9EBA1,
+        ),
+    ]
+
+    message = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    state = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476]
+    for offset in range(0, len(message), 64):
+        block = struct.unpack("<16I", message[offset:offset + 64])
+        regs = list(state)
+        for fn, order, shifts, const in rounds:
+            for i in range(16):
+                # Registers rotate a, d, c, b through the target slot
+                t = (4 - i % 4) % 4
+                a, b, c, d = regs[t], regs[(t + 1) % 4], regs[(t + 2) % 4], regs[(t + 3) % 4]
+                regs[t] = rotl(a + fn(b, c, d) + block[order[i]] + const, shifts[i % 4])
+        state = [(s + r) & mask for s, r in zip(state, regs)]
+    return struct.pack("<4I", *state)
+
+
+def hash_password(password: str, algorithm: str = "sha1") -> bytes:
+    """Return the raw SHA-1 or NTLM digest of a password."""
+    if algorithm == "sha1":
+        return hashlib.sha1(password.encode("utf-8")).digest()
+    if algorithm == "ntlm":
+        data = password.encode("utf-16-le")
+        try:
+            return hashlib.new("md4", data).digest()
+        except ValueError:
+            return _md4(data)
+    raise ValueError(f"Unknown hash algorithm '{algorithm}'. Choose from: {', '.join(ALGORITHMS)}")
+
+
+def _iter_prefixes(
+    stream: BinaryIO, algorithm: str, prefix_bytes: int, plaintext: bool
+) -> Iterator[bytes]:
+    """Yield hash prefixes from ``HASH[:count]`` lines, or from plaintext lines."""
+    digest_size = DIGEST_SIZES[algorithm]
+    for line in stream:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        if plaintext:
+            yield hash_password(line.decode("utf-8", "replace"), algorithm)[:prefix_bytes]
+            continue
+        try:
+            digest = binascii.unhexlify(line.split(b":", 1)[0].strip())
+        except (binascii.Error, ValueError):
+            continue
+        if len(digest) == digest_size:
+            yield digest[:prefix_bytes]
+
+
+def _read_records(path: str, width: int) -> Iterator[bytes]:
+    """Yield fixed-width records from a temporary sorted run."""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(width * 8192)
+            if not block:
+                return
+            for i in range(0, len(block), width):
+                yield block[i:i + width]
+
+
+def build_breach_index(
+    source: str,
+    output: str,
+    algorithm: str = "sha1",
+    prefix_bytes: int = DEFAULT_PREFIX_BYTES,
+    plaintext: bool = False,
+    chunk_records: int = SORT_CHUNK_RECORDS,
+    merge_fan_in: int = MERGE_FAN_IN,
+) -> int:
+    """Build a sorted prefix index from a breach dump and return the entry count.
+
+    ``source`` holds one ``HASH`` or ``HASH:count`` per line (the Have I Been
+    Pwned format), or one password per line with ``plaintext``. Input is
+    sorted in bounded chunks and merged from disk, at most ``merge_fan_in``
+    runs at a time, so neither memory use nor open files depend on the
+    dump size.
+    """
+    if merge_fan_in < 2:
+        raise ValueError("Merge fan-in must be at least 2")
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm '{algorithm}'. Choose from: {', '.join(ALGORITHMS)}")
+    if not 4 <= prefix_bytes <= DIGEST_SIZES[algorithm]:
+        raise ValueError(f"Prefix length must be between 4 and {DIGEST_SIZES[algorithm]} bytes")
+
+    runs: List[str] = []
+    stream = sys.stdin.buffer if source == "-" else open(source, "rb")
+    try:
+        chunk: List[bytes] = []
+        for prefix in _iter_prefixes(stream, algorithm, prefix_bytes, plaintext):
+            chunk.append(prefix)
+            if len(chunk) >= chunk_records:
+                runs.append(_write_run(chunk))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(chunk))
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    try:
+        # Merge the oldest runs into one new run until a single pass can finish
+        while len(runs) > merge_fan_in:
+            group = runs[:merge_fan_in]
+            merged = _merge_runs(group, prefix_bytes)
+            runs = runs[merge_fan_in:] + [merged]
+            for run in group:
+                os.unlink(run)
+        with open(output, "wb") as out:
+            out.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, ALGORITHMS[algorithm], prefix_bytes, 0))
+            count = _write_merged(out, runs, prefix_bytes)
+            out.seek(0)
+            out.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, ALGORITHMS[algorithm], prefix_bytes, count))
+    finally:
+        for run in runs:
+            os.unlink(run)
+    return count
+
+
+def _write_merged(out: BinaryIO, runs: List[str], width: int) -> int:
+    """Merge sorted runs into ``out``, dropping duplicates; return the records written."""
+    count = 0
+    previous = None
+    buffer = []
+    for record in heapq.merge(*(_read_records(run, width) for run in runs)):
+        if record == previous:
+            continue
+        previous = record
+        buffer.append(record)
+        count += 1
+        if len(buffer) >= 8192:
+            out.write(b"".join(buffer))
+            buffer.clear()
+    out.write(b"".join(buffer))
+    return count
+
+
+def _merge_runs(runs: List[str], width: int) -> str:
+    """Merge sorted runs into a new temporary run and return its path."""
+    fd, path = tempfile.mkstemp(prefix="ciphersmith-breach-", suffix=".run")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _write_merged(f, runs, width)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _write_run(chunk: List[bytes]) -> str:
+    """Sort a chunk of prefixes and spill it to a temporary file."""
+    chunk.sort()
+    fd, path = tempfile.mkstemp(prefix="ciphersmith-breach-", suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(chunk))
+    return path
+
+
+class BreachIndex:
+    """Memory-mapped, binary-searched index of breached password hashes."""
+
+    def __init__(self, path: str):
+        """Open an index built by ``build_breach_index``."""
+        self.path = path
+        self._file = open(path, "rb")
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a breach index")
+        magic, version, algorithm_id, self.prefix_bytes, self.count = HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a breach index")
+        self.algorithm = next(name for name, value in ALGORITHMS.items() if value == algorithm_id)
+        # Pages are only faulted in along each lookup's search path
+        self._mmap = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def contains_hash(self, digest: bytes) -> bool:
+        """Return True if a raw digest's prefix is in the index (O(log n))."""
+        if self._mmap is None:
+            return False
+        prefix = digest[:self.prefix_bytes]
+        width = self.prefix_bytes
+        base = HEADER.size
+        data = self._mmap
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * width
+            record = data[offset:offset + width]
+            if record < prefix:
+                lo = mid + 1
+            elif record > prefix:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains(self, password: str) -> bool:
+        """Return True if the password appears in the breach corpus."""
+        return self.contains_hash(hash_password(password, self.algorithm))
+
+    def close(self):
+        """Unmap and close the index file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PasswordScreen:
+    """Screen passwords against a Bloom filter, confirming hits in a breach index.
+
+    A filter miss is definite, so the exact index is only searched for the
+    rare filter hits. With just a filter, hits are treated as compromised;
+    with just an index, every password is looked up.
+    """
+
+    def __init__(self, bloom_filter=None, breach_index: Optional[BreachIndex] = None):
+        self.bloom_filter = bloom_filter
+        self.breach_index = breach_index
+
+    def contains(self, password: str) -> bool:
+        """Return True if the password is considered compromised."""
+        if self.bloom_filter is not None:
+            if not self.bloom_filter.contains(password):
+                return False
+            if self.breach_index is None:
+                return True
+        if self.breach_index is not None:
+            return self.breach_index.contains(password)
+        return False
+
+
+@lru_cache(maxsize=4)
+def open_screen(
+    breach_index_path: Optional[str] = None, bloom_filter_path: Optional[str] = None
+) -> Optional[PasswordScreen]:
+    """Return a shared, per-process screen for the given files, or None if neither is set."""
+    if not breach_index_path and not bloom_filter_path:
+        return None
+    from app.bloom import BloomFilter
+
+    return PasswordScreen(
+        BloomFilter(bloom_filter_path) if bloom_filter_path else None,
+        BreachIndex(breach_index_path) if breach_index_path else None,
+    )
+
+
+def replace_breached(passwords: Iterable[str], policy, screen) -> Iterator[str]:
+    """Yield passwords, regenerating any that ``screen.contains`` flags."""
+    for password in passwords:
+        while screen is not None and screen.contains(password):
+            password = policy.generate(1)[0]
+        yield password
@@ -5,20 +5,18 @@ from ..database import PasswordDatabase
 @click.command()
 @click.option('--limit', '-l', type=int, help='Limit the number of entries to show')
 @click.option('--tag', '-t', help='Filter entries by tag')
-def history(limit: int, tag: str):
+@click.option('--after', type=int, help='Show entries older than this entry ID')
+def history(limit: int, tag: str, after: int):
     """Show password generation history."""
     db = PasswordDatabase()
     try:
-        history_entries = db.get_password_history(limit=limit, tag=tag)
-        if not history_entries:
-            click.echo("No history entries found.")
-            return
-
-        for entry in history_entries:
+        found = False
+        for entry in db.iter_history(tag=tag, after=after, limit=limit):
+            found = True
             created_at = datetime.fromisoformat(entry['created_at']).strftime('%Y-%m-%d %H:%M:%S')
-            config = entry.get('config', '{}')
-            description = entry.get('description', '')
-            tags = entry.get('tags', '[]')
+            config = entry['config'] or '{}'
+            description = entry['description'] or ''
+            tags = entry['tags'] or '[]'
             
             click.echo(f"\n{created_at} - Length: {entry['length']}")
             if description:
@@ -27,6 +25,8 @@ def history(limit: int, tag: str):
                 click.echo(f"Tags: {tags}")
             click.echo(f"Config: {config}")
             click.echo("-" * 50)
+        if not found:
+            click.echo("No history entries found.")
     except Exception as e:
         click.echo(f"Error retrieving password history: {str(e)}", err=True)
     finally:
@@ -1,27 +1,230 @@
+import atexit
+import hashlib
 import sqlite3
 import json
-from datetime import datetime, timedelta
+import os
+import queue
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any, Union
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Any, Tuple, TypeVar, Union
+
+# Rows written per transaction by add_passwords.
+DEFAULT_BATCH_SIZE = 1000
+
+# Write-behind defaults: entries buffered before put() blocks, and the
+# longest an entry waits in memory before its group commit (seconds).
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Config keys stored as typed generation_configs columns (besides the JSON).
+CONFIG_COUNT_FIELDS = ("total_length", "numbers", "lowercase", "uppercase", "special_chars")
+CONFIG_FLAG_FIELDS = ("exclude_similar", "no_specials")
+
+# Rows fetched per query when iterating history lazily.
+DEFAULT_PAGE_SIZE = 500
+
+# Rows deleted per transaction by retention purges; small enough that
+# concurrent writers only ever wait on one short batch.
+DEFAULT_PURGE_BATCH_SIZE = 5000
+
+# Search ranks at most this many of the newest matches, keeping latency
+# independent of how many rows a common term matches; older matches follow
+# unranked, newest first.
+SEARCH_RANK_WINDOW = 1000
+
+# Stored in PRAGMA user_version; _migrate upgrades older databases.
+SCHEMA_VERSION = 4
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """SQLite connection settings applied when a PasswordDatabase is opened."""
+
+    journal_mode: str = "WAL"  # readers never block the writer, and vice versa
+    synchronous: str = "NORMAL"  # with WAL, durable at checkpoints; safe against corruption
+    cache_size_kib: int = 16384
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout_ms: int = 5000
+    # BEGIN IMMEDIATE takes the write lock up front, so a contended writer
+    # waits in the busy handler instead of failing on lock upgrade.
+    begin: str = "IMMEDIATE"
+    retries: int = 5
+    retry_backoff: float = 0.05  # seconds; doubled (with jitter) on every retry
+
+
+DEFAULT_PROFILE = ConnectionProfile()
+# The settings used before profiles existed: rollback journal, full syncs.
+LEGACY_PROFILE = ConnectionProfile(
+    journal_mode="DELETE",
+    synchronous="FULL",
+    cache_size_kib=2000,
+    mmap_size=0,
+    begin="DEFERRED",
+    retries=0,
+)
+PROFILES = {"default": DEFAULT_PROFILE, "legacy": LEGACY_PROFILE}
+
+# Names the profile used when none is passed in; "legacy" suits filesystems
+# without the shared memory WAL needs (NFS, SMB).
+PROFILE_ENV_VAR = "CIPHERSMITH_DB_PROFILE"
+
+
+def profile_from_env() -> ConnectionProfile:
+    """Return the profile named by PROFILE_ENV_VAR, or DEFAULT_PROFILE if it is unset."""
+    name = os.environ.get(PROFILE_ENV_VAR) or "default"
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown database profile '{name}' in {PROFILE_ENV_VAR}. Choose from: {', '.join(PROFILES)}"
+        ) from None
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How much history to keep; None means no limit on that axis."""
+
+    max_age_days: Optional[int] = None
+    max_rows: Optional[int] = None
+
+
+def _is_lock_error(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _paginate(
+    fetch: Callable[[Optional[Tuple], int], List[sqlite3.Row]],
+    key_of: Callable[[sqlite3.Row], Tuple],
+    key: Optional[Tuple],
+    offset: int,
+    limit: Optional[int],
+    page_size: int,
+    fetch_keys: Optional[Callable[[Optional[Tuple], int], List[sqlite3.Row]]] = None,
+) -> Iterator[sqlite3.Row]:
+    """Drive a keyset query page by page.
+
+    ``fetch(key, size)`` returns up to ``size`` rows ordered after ``key``
+    (from the start when None); ``key_of`` gives a row's key. The first
+    ``offset`` rows are skipped by walking the keyset, through
+    ``fetch_keys`` (same contract, but only the key columns need be
+    selected) when given.
+    """
+    skip = fetch_keys or fetch
+    while offset > 0:
+        rows = skip(key, min(offset, page_size))
+        if not rows:
+            return
+        offset -= len(rows)
+        key = key_of(rows[-1])
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = fetch(key, size)
+        yield from rows
+        if len(rows) < size:
+            return
+        if remaining is not None:
+            remaining -= size
+        key = key_of(rows[-1])
+
+
+def _canonical_config(config: Any) -> Optional[str]:
+    """Return a generation config as canonical JSON, or None.
+
+    Accepts a dict or an already-encoded JSON string; older rows were encoded
+    twice, so strings are decoded until a non-string value comes out.
+    """
+    while isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except ValueError:
+            break
+    if config is None:
+        return None
+    return json.dumps(config, sort_keys=True, separators=(",", ":"))
+
+
+def _config_columns(config: Any) -> tuple:
+    """Extract the typed generation_configs columns from a decoded config."""
+    if not isinstance(config, dict):
+        return (None,) * len(CONFIG_COUNT_FIELDS) + (0,) * len(CONFIG_FLAG_FIELDS)
+    # The CLI nests the counts under "composition"; other callers pass them flat
+    composition = config.get("composition")
+    counts = composition if isinstance(composition, dict) else config
+    return tuple(
+        counts.get(field) if type(counts.get(field)) is int else None
+        for field in CONFIG_COUNT_FIELDS
+    ) + tuple(int(bool(config.get(field))) for field in CONFIG_FLAG_FIELDS)
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query of quoted prefix terms (all must match)."""
+    # Quoting each word keeps FTS5 operators in user input from being interpreted
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
 
 
 class PasswordDatabase:
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize the database with the given path or default to user's home directory."""
+    def __init__(self, db_path: Optional[str] = None, profile: Optional[ConnectionProfile] = None):
+        """Initialize the database with the given path or default to user's home directory.
+
+        Without a ``profile``, the one named by the CIPHERSMITH_DB_PROFILE
+        environment variable is used (``default`` when unset).
+        """
         if db_path is None:
             home = Path.home()
             db_path = str(home / ".secure_passgen" / "passwords.db")
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.profile = profile or profile_from_env()
+        self.conn = sqlite3.connect(
+            db_path,
+            timeout=self.profile.busy_timeout_ms / 1000,
+            isolation_level=self.profile.begin,
+        )
         self.conn.row_factory = sqlite3.Row
+        self._configure()
         self._init_db()
 
+    def _configure(self):
+        """Apply the connection profile's pragmas."""
+        profile = self.profile
+        # Must precede the journal mode switch, which writes the file header.
+        # Only takes effect on a new file; older databases need
+        # vacuum(enable_incremental=True) once to switch over.
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._with_retry(lambda: self.conn.execute(f"PRAGMA journal_mode={profile.journal_mode}"))
+        self.conn.execute(f"PRAGMA synchronous={profile.synchronous}")
+        self.conn.execute(f"PRAGMA cache_size={-profile.cache_size_kib}")
+        self.conn.execute(f"PRAGMA mmap_size={profile.mmap_size}")
+        self.conn.execute(f"PRAGMA busy_timeout={profile.busy_timeout_ms}")
+
+    def _with_retry(self, operation: Callable[[], T]) -> T:
+        """Run a write, retrying with exponential backoff while the database is locked."""
+        delay = self.profile.retry_backoff
+        for attempt in range(self.profile.retries + 1):
+            try:
+                return operation()
+            except sqlite3.OperationalError as e:
+                if attempt == self.profile.retries or not _is_lock_error(e):
+                    raise
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                time.sleep(delay * (1 + random.random()))
+                delay *= 2
+
     def _init_db(self):
         """Initialize the database schema."""
         cursor = self.conn.cursor()
-        cursor.executescript(
+        self._with_retry(lambda: cursor.executescript(
             """
             CREATE TABLE IF NOT EXISTS password_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -30,14 +233,286 @@ class PasswordDatabase:
                 length INTEGER NOT NULL,
                 config TEXT,
                 description TEXT,
-                tags TEXT
+                tags TEXT,
+                config_id INTEGER REFERENCES generation_configs(id)
+            );
+
+            -- One row per distinct generation config; history rows point here
+            -- (password_history.config is only set on rows from before v4).
+            CREATE TABLE IF NOT EXISTS generation_configs (
+                id INTEGER PRIMARY KEY,
+                config_hash TEXT NOT NULL UNIQUE,
+                config TEXT NOT NULL,
+                total_length INTEGER,
+                numbers INTEGER,
+                lowercase INTEGER,
+                uppercase INTEGER,
+                special_chars INTEGER,
+                exclude_similar INTEGER NOT NULL DEFAULT 0,
+                no_specials INTEGER NOT NULL DEFAULT 0
             );
             
             CREATE INDEX IF NOT EXISTS idx_created_at ON password_history(created_at);
             CREATE INDEX IF NOT EXISTS idx_password_hash ON password_history(password_hash);
+
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+
+            -- Primary key order makes "entries with tag X" an index range scan
+            CREATE TABLE IF NOT EXISTS password_tags (
+                tag_id INTEGER NOT NULL REFERENCES tags(id),
+                password_id INTEGER NOT NULL REFERENCES password_history(id),
+                PRIMARY KEY (tag_id, password_id)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_password_tags_password ON password_tags(password_id);
+
+            CREATE TRIGGER IF NOT EXISTS trg_password_history_delete_tags
+            AFTER DELETE ON password_history
+            BEGIN
+                DELETE FROM password_tags WHERE password_id = OLD.id;
+            END;
+
+            -- External-content full-text index; the JSON tags column tokenizes
+            -- to its tag names, so one MATCH covers description and tags.
+            -- Prefix indexes let short prefix queries stream like whole terms.
+            CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                description,
+                tags,
+                content='password_history',
+                content_rowid='id',
+                prefix='2 3 4'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_history_fts_insert
+            AFTER INSERT ON password_history
+            BEGIN
+                INSERT INTO history_fts (rowid, description, tags)
+                VALUES (NEW.id, NEW.description, NEW.tags);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_history_fts_delete
+            AFTER DELETE ON password_history
+            BEGIN
+                INSERT INTO history_fts (history_fts, rowid, description, tags)
+                VALUES ('delete', OLD.id, OLD.description, OLD.tags);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_history_fts_update
+            AFTER UPDATE OF description, tags ON password_history
+            BEGIN
+                INSERT INTO history_fts (history_fts, rowid, description, tags)
+                VALUES ('delete', OLD.id, OLD.description, OLD.tags);
+                INSERT INTO history_fts (rowid, description, tags)
+                VALUES (NEW.id, NEW.description, NEW.tags);
+            END;
+
+            -- Aggregates for get_stats, maintained row by row so reading
+            -- them never scans password_history.
+            CREATE TABLE IF NOT EXISTS history_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL DEFAULT 0,
+                length_sum INTEGER NOT NULL DEFAULT 0,
+                last_generated TIMESTAMP
+            );
+            INSERT OR IGNORE INTO history_totals (id) VALUES (1);
+
+            CREATE TABLE IF NOT EXISTS length_counts (
+                length INTEGER PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS daily_counts (
+                day TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS tag_counts (
+                tag_id INTEGER PRIMARY KEY REFERENCES tags(id),
+                count INTEGER NOT NULL
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_insert
+            AFTER INSERT ON password_history
+            BEGIN
+                UPDATE history_totals
+                SET total = total + 1,
+                    length_sum = length_sum + NEW.length,
+                    last_generated = MAX(COALESCE(last_generated, NEW.created_at), NEW.created_at)
+                WHERE id = 1;
+                INSERT INTO length_counts (length, count) VALUES (NEW.length, 1)
+                ON CONFLICT (length) DO UPDATE SET count = count + 1;
+                INSERT INTO daily_counts (day, count) VALUES (DATE(NEW.created_at), 1)
+                ON CONFLICT (day) DO UPDATE SET count = count + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_delete
+            AFTER DELETE ON password_history
+            BEGIN
+                UPDATE history_totals
+                SET total = total - 1,
+                    length_sum = length_sum - OLD.length,
+                    last_generated = CASE
+                        WHEN OLD.created_at < last_generated THEN last_generated
+                        ELSE (SELECT MAX(created_at) FROM password_history)
+                    END
+                WHERE id = 1;
+                UPDATE length_counts SET count = count - 1 WHERE length = OLD.length;
+                DELETE FROM length_counts WHERE length = OLD.length AND count <= 0;
+                UPDATE daily_counts SET count = count - 1 WHERE day = DATE(OLD.created_at);
+                DELETE FROM daily_counts WHERE day = DATE(OLD.created_at) AND count <= 0;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_tag_counts_insert
+            AFTER INSERT ON password_tags
+            BEGIN
+                INSERT INTO tag_counts (tag_id, count) VALUES (NEW.tag_id, 1)
+                ON CONFLICT (tag_id) DO UPDATE SET count = count + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_tag_counts_delete
+            AFTER DELETE ON password_tags
+            BEGIN
+                UPDATE tag_counts SET count = count - 1 WHERE tag_id = OLD.tag_id;
+                DELETE FROM tag_counts WHERE tag_id = OLD.tag_id AND count <= 0;
+            END;
         """
-        )
+        ))
         self.conn.commit()
+        self._with_retry(self._migrate)
+
+    def _migrate(self):
+        """Bring older databases up to the current schema version."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self.conn:
+            if version < 1:
+                # Copy tags from the JSON column into the normalized tables
+                self.conn.execute(
+                    """
+                    INSERT OR IGNORE INTO tags (name)
+                    SELECT DISTINCT j.value
+                    FROM password_history h, json_each(h.tags) j
+                    WHERE h.tags IS NOT NULL
+                    """
+                )
+                self.conn.execute(
+                    """
+                    INSERT OR IGNORE INTO password_tags (tag_id, password_id)
+                    SELECT t.id, h.id
+                    FROM password_history h, json_each(h.tags) j
+                    JOIN tags t ON t.name = j.value
+                    WHERE h.tags IS NOT NULL
+                    """
+                )
+            if version < 2:
+                # Index the rows written before the FTS triggers existed
+                self.conn.execute("INSERT INTO history_fts (history_fts) VALUES ('rebuild')")
+            if version < 3:
+                self._rebuild_stats()
+            if version < 4:
+                self._intern_legacy_configs()
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _intern_legacy_configs(self):
+        """Move per-row config blobs into generation_configs (inside a transaction)."""
+        columns = [row["name"] for row in self.conn.execute("PRAGMA table_info(password_history)")]
+        if "config_id" not in columns:
+            self.conn.execute(
+                "ALTER TABLE password_history"
+                " ADD COLUMN config_id INTEGER REFERENCES generation_configs(id)"
+            )
+        self.conn.execute("DROP VIEW IF EXISTS history_entries")
+        self.conn.execute(
+            """
+            CREATE VIEW history_entries AS
+            SELECT h.id, h.password_hash, h.created_at, h.length,
+                   c.config,
+                   h.description, h.tags, h.config_id
+            FROM password_history h
+            LEFT JOIN generation_configs c ON c.id = h.config_id
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_password_history_config ON password_history(config_id)"
+        )
+
+        self.conn.execute("CREATE TEMP TABLE config_map (config TEXT PRIMARY KEY, config_id INTEGER)")
+        try:
+            raw = [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT DISTINCT config FROM password_history WHERE config IS NOT NULL"
+                )
+            ]
+            ids = self._intern_configs({_canonical_config(config) for config in raw})
+            self.conn.executemany(
+                "INSERT INTO config_map (config, config_id) VALUES (?, ?)",
+                [(config, ids[_canonical_config(config)]) for config in raw],
+            )
+            self.conn.execute(
+                """
+                UPDATE password_history
+                SET config_id = (
+                        SELECT config_id FROM config_map WHERE config_map.config = password_history.config
+                    ),
+                    config = NULL
+                WHERE config IS NOT NULL
+                """
+            )
+        finally:
+            self.conn.execute("DROP TABLE temp.config_map")
+
+    def _intern_configs(self, configs: Iterable[str]) -> Dict[str, int]:
+        """Return generation_configs ids for canonical config JSON strings, adding new ones."""
+        ids = {}
+        for config in configs:
+            config_hash = hashlib.sha256(config.encode("utf-8")).hexdigest()
+            self.conn.execute(
+                """
+                INSERT OR IGNORE INTO generation_configs (
+                    config_hash, config, total_length, numbers, lowercase,
+                    uppercase, special_chars, exclude_similar, no_specials
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (config_hash, config) + _config_columns(json.loads(config)),
+            )
+            ids[config] = self.conn.execute(
+                "SELECT id FROM generation_configs WHERE config_hash = ?", (config_hash,)
+            ).fetchone()[0]
+        return ids
+
+    def _rebuild_stats(self):
+        """Recompute the aggregate tables from password_history (inside a transaction)."""
+        for statement in (
+            "DELETE FROM length_counts",
+            "DELETE FROM daily_counts",
+            "DELETE FROM tag_counts",
+            """
+            UPDATE history_totals SET
+                total = (SELECT COUNT(*) FROM password_history),
+                length_sum = (SELECT COALESCE(SUM(length), 0) FROM password_history),
+                last_generated = (SELECT MAX(created_at) FROM password_history)
+            WHERE id = 1
+            """,
+            """
+            INSERT INTO length_counts (length, count)
+            SELECT length, COUNT(*) FROM password_history GROUP BY length
+            """,
+            """
+            INSERT INTO daily_counts (day, count)
+            SELECT DATE(created_at), COUNT(*) FROM password_history GROUP BY DATE(created_at)
+            """,
+            """
+            INSERT INTO tag_counts (tag_id, count)
+            SELECT tag_id, COUNT(*) FROM password_tags GROUP BY tag_id
+            """,
+        ):
+            self.conn.execute(statement)
 
     def close(self):
         """Close the database connection."""
@@ -53,23 +528,117 @@ class PasswordDatabase:
         tags: Optional[List[str]] = None,
     ) -> int:
         """Add a password entry to the database."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO password_history 
-            (password_hash, length, config, description, tags)
+        return self._insert_batch(
+            [(password_hash, length, _canonical_config(config), description, tags)],
+            return_ids=True,
+        )[0]
+
+    def add_passwords(
+        self,
+        entries: Iterable[Dict[str, Any]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """Add many password entries, committing once per batch of ``batch_size`` rows.
+
+        Each entry takes the same keys as ``add_password``. Returns the number of rows added.
+        """
+        count = 0
+        batch = []
+        for entry in entries:
+            batch.append(
+                (
+                    entry["password_hash"],
+                    entry["length"],
+                    _canonical_config(entry.get("config")),
+                    entry.get("description"),
+                    entry.get("tags"),
+                )
+            )
+            if len(batch) >= batch_size:
+                self._insert_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._insert_batch(batch)
+            count += len(batch)
+        return count
+
+    def _insert_batch(self, rows: List[tuple], return_ids: bool = False) -> Optional[List[int]]:
+        """Insert ``(hash, length, canonical_config, description, tags)`` rows in one transaction.
+
+        Untagged rows go through a single executemany call. Row ids are only
+        read back, one statement per row, when ``return_ids`` is set or some
+        row has tags to link.
+
+        Returns the new row ids, or None if they were not read back.
+        """
+        sql = """
+            INSERT INTO password_history
+            (password_hash, length, config_id, description, tags)
             VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                password_hash,
-                length,
-                json.dumps(config),
-                description,
-                json.dumps(tags) if tags else None,
-            ),
+        """
+
+        def insert():
+            with self.conn:
+                # A batch almost always shares one config, so this is one lookup
+                config_ids = self._intern_configs({row[2] for row in rows if row[2] is not None})
+                values = [
+                    (hash_, length, config_ids.get(config), description, json.dumps(tags) if tags else None)
+                    for hash_, length, config, description, tags in rows
+                ]
+                if not return_ids and not any(row[4] for row in rows):
+                    self.conn.executemany(sql, values)
+                    return None
+                # Each id comes from its own lastrowid; executemany does not
+                # report them and the batch need not get consecutive ids
+                cursor = self.conn.cursor()
+                ids = []
+                for value in values:
+                    cursor.execute(sql, value)
+                    ids.append(cursor.lastrowid)
+                self._link_tags(ids, [row[4] for row in rows])
+            return ids
+
+        return self._with_retry(insert)
+
+    def _link_tags(self, ids: List[int], tag_lists: List[Optional[List[str]]]):
+        """Insert password_tags rows for newly added entries."""
+        names = {tag for tags in tag_lists if tags for tag in tags}
+        if not names:
+            return
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO tags (name) VALUES (?)", [(name,) for name in names]
+        )
+        placeholders = ",".join("?" * len(names))
+        tag_ids = dict(
+            self.conn.execute(
+                f"SELECT name, id FROM tags WHERE name IN ({placeholders})", list(names)
+            ).fetchall()
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO password_tags (tag_id, password_id) VALUES (?, ?)",
+            [
+                (tag_ids[tag], entry_id)
+                for entry_id, tags in zip(ids, tag_lists)
+                if tags
+                for tag in tags
+            ],
+        )
+
+    def write_behind(
+        self,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> "WriteBehindQueue":
+        """Return a queue that persists entries to this database from a background thread."""
+        return WriteBehindQueue(
+            self.db_path,
+            self.profile,
+            flush_interval=flush_interval,
+            max_pending=max_pending,
+            batch_size=batch_size,
         )
-        self.conn.commit()
-        return cursor.lastrowid
 
     def get_password_history(
         self,
@@ -77,120 +646,497 @@ class PasswordDatabase:
         tag: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get password history with optional limit and tag filter."""
-        cursor = self.conn.cursor()
-        query = "SELECT * FROM password_history"
-        params = []
+        return [dict(row) for row in self.iter_history(tag=tag, limit=limit)]
+
+    def iter_history(
+        self,
+        tag: Optional[str] = None,
+        after: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        oldest_first: bool = False,
+    ) -> Iterator[sqlite3.Row]:
+        """Lazily yield history rows, newest first unless ``oldest_first``.
 
+        Rows are read ``page_size`` at a time with keyset queries on
+        ``(created_at, id)``, so every page is an index seek no matter how
+        deep it is. ``after`` is an entry id to continue from (exclusive);
+        ``offset`` skips that many further rows first. ``since`` (inclusive)
+        and ``until`` (exclusive) bound ``created_at``, which is UTC.
+        """
+        clauses = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.strftime("%Y-%m-%d %H:%M:%S"))
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until.strftime("%Y-%m-%d %H:%M:%S"))
         if tag:
-            query += " WHERE tags LIKE ?"
-            params.append(f'%"{tag}"%')
+            row = self.conn.execute("SELECT id FROM tags WHERE name = ?", (tag,)).fetchone()
+            if row is None:
+                return
+            # EXISTS keeps the scan on idx_created_at; IN would sort every tagged row
+            clauses.append(
+                "EXISTS (SELECT 1 FROM password_tags"
+                " WHERE tag_id = ? AND password_id = history_entries.id)"
+            )
+            params.append(row["id"])
+
+        key = None
+        if after is not None:
+            row = self.conn.execute(
+                "SELECT created_at, id FROM password_history WHERE id = ?", (after,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"No history entry with ID {after}")
+            key = (row["created_at"], row["id"])
 
-        query += " ORDER BY created_at DESC"
+        order = "ASC" if oldest_first else "DESC"
+        beyond = ">" if oldest_first else "<"
 
-        if limit:
-            query += " LIMIT ?"
-            params.append(limit)
+        def select(extra, extra_args, order_by, size, columns="*"):
+            where = clauses + extra
+            sql = f"SELECT {columns} FROM history_entries"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += f" ORDER BY {order_by} LIMIT ?"
+            return self.conn.execute(sql, params + extra_args + [size]).fetchall()
 
-        cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        def fetch(key, size, columns="*"):
+            if key is None:
+                return select([], [], f"created_at {order}, id {order}", size, columns)
+            # Rest of the key's timestamp, then the timestamps beyond it: two
+            # seeks on idx_created_at (which ends in the rowid). A row-value
+            # comparison would rescan the whole timestamp group on every page,
+            # and one bulk generate run can share a single second.
+            created_at, entry_id = key
+            rows = select(
+                ["created_at = ?", f"id {beyond} ?"],
+                [created_at, entry_id],
+                f"id {order}",
+                size,
+                columns,
+            )
+            if len(rows) < size:
+                rows += select(
+                    [f"created_at {beyond} ?"],
+                    [created_at],
+                    f"created_at {order}, id {order}",
+                    size - len(rows),
+                    columns,
+                )
+            return rows
+
+        yield from _paginate(
+            fetch,
+            lambda row: (row["created_at"], row["id"]),
+            key,
+            offset,
+            limit,
+            page_size,
+            fetch_keys=lambda key, size: fetch(key, size, "created_at, id"),
+        )
 
     def get_all_tags(self) -> List[str]:
         """Get all unique tags used in the database."""
         cursor = self.conn.cursor()
         cursor.execute(
-            "SELECT DISTINCT tags FROM password_history WHERE tags IS NOT NULL"
+            """
+            SELECT name FROM tags
+            WHERE EXISTS (SELECT 1 FROM password_tags WHERE tag_id = tags.id)
+            ORDER BY name
+            """
         )
+        return [row["name"] for row in cursor.fetchall()]
 
-        all_tags = set()
-        for row in cursor.fetchall():
-            tags = json.loads(row["tags"])
-            all_tags.update(tags)
+    def search_passwords(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search passwords by description or tags, best matches first.
 
-        return sorted(list(all_tags))
+        Every word in ``query`` must match the start of a word in the
+        description or a tag, so ``wor`` finds entries tagged ``work``.
+        Results are in ``iter_search`` order: the newest
+        SEARCH_RANK_WINDOW matches ranked by relevance, then any older
+        matches newest first (their ``rank`` is None).
+        """
+        return [dict(row) for row in self.iter_search(query, limit=limit)]
 
-    def search_passwords(self, query: str) -> List[Dict[str, Any]]:
-        """Search passwords by description or tags."""
-        cursor = self.conn.cursor()
-        # Make search case-insensitive and search in both description and tags
-        cursor.execute(
+    def iter_search(
+        self,
+        query: str,
+        after: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[sqlite3.Row]:
+        """Lazily yield every entry matching ``query``, best matches first.
+
+        bm25 has to score every candidate, so only the newest
+        SEARCH_RANK_WINDOW matches are ranked, by ``(rank, id)``; every
+        older match follows, newest first. Both parts are read with keyset
+        queries, so each page costs the same however deep it is. Rows carry
+        a ``rank`` column (None past the window). ``after`` is the ID of
+        the last entry already shown; ``offset`` skips that many further
+        matches, walking only the FTS index.
+
+        Raises:
+            ValueError: If ``after`` is not a matching entry
+        """
+        match = _fts_query(query)
+        if not match:
+            return
+        # FTS5 walks its doclists newest-first and honours the rowid bound
+        # without a scan, so finding the window edge is cheap
+        floor = self.conn.execute(
             """
-            SELECT * FROM password_history 
-            WHERE LOWER(description) LIKE LOWER(?) 
-               OR LOWER(tags) LIKE LOWER(?) 
-               OR EXISTS (
-                   SELECT 1 
-                   FROM json_each(tags) 
-                   WHERE LOWER(value) LIKE LOWER(?)
-               )
-            ORDER BY created_at DESC
+            SELECT MIN(rowid) FROM (
+                SELECT rowid FROM history_fts WHERE history_fts MATCH ?
+                ORDER BY rowid DESC LIMIT ?
+            )
             """,
-            (f"%{query}%", f"%{query}%", f"%{query}%"),
+            (match, SEARCH_RANK_WINDOW),
+        ).fetchone()[0]
+        if floor is None:
+            return
+
+        def ranked(key, size, keys_only):
+            # Ranking and limiting happen before the join, so only returned
+            # rows are read from password_history
+            sql = """
+                SELECT rowid, rank FROM history_fts
+                WHERE history_fts MATCH ? AND rowid >= ?
+            """
+            args: List[Any] = [match, floor]
+            if key is not None:
+                sql += " AND (rank > ? OR (rank = ? AND rowid < ?))"
+                args += [key[1], key[1], key[2]]
+            sql += " ORDER BY rank, rowid DESC LIMIT ?"
+            if keys_only:
+                sql = f"SELECT rowid AS id, rank FROM ({sql}) ORDER BY rank, id DESC"
+            else:
+                sql = f"""
+                    SELECT h.*, f.rank AS rank FROM ({sql}) AS f
+                    JOIN history_entries h ON h.id = f.rowid
+                    ORDER BY f.rank, f.rowid DESC
+                """
+            return self.conn.execute(sql, args + [size]).fetchall()
+
+        def older(key, size, keys_only):
+            columns = "f.rowid AS id, NULL AS rank" if keys_only else "h.*, NULL AS rank"
+            sql = f"SELECT {columns} FROM history_fts f"
+            if not keys_only:
+                sql += " JOIN history_entries h ON h.id = f.rowid"
+            sql += " WHERE history_fts MATCH ? AND f.rowid < ?"
+            bound = floor if key is None else key[2]
+            sql += " ORDER BY f.rowid DESC LIMIT ?"
+            return self.conn.execute(sql, [match, bound, size]).fetchall()
+
+        def fetch(key, size, keys_only=False):
+            rows = []
+            if key is None or key[0] == 0:
+                rows = ranked(key, size, keys_only)
+                if len(rows) == size:
+                    return rows
+                key = None
+            return rows + older(key, size - len(rows), keys_only)
+
+        key = None
+        if after is not None:
+            if after >= floor:
+                row = self.conn.execute(
+                    "SELECT rank FROM history_fts WHERE history_fts MATCH ? AND rowid = ?",
+                    (match, after),
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Entry {after} does not match '{query}'")
+                key = (0, row["rank"], after)
+            else:
+                key = (1, None, after)
+
+        yield from _paginate(
+            fetch,
+            lambda row: (0 if row["rank"] is not None else 1, row["rank"], row["id"]),
+            key,
+            offset,
+            limit,
+            page_size,
+            fetch_keys=lambda key, size: fetch(key, size, keys_only=True),
         )
-        return [dict(row) for row in cursor.fetchall()]
 
     def delete_password(self, entry_id: int) -> bool:
         """Delete a password entry by ID."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "DELETE FROM password_history WHERE id = ?",
-            (entry_id,),
-        )
-        self.conn.commit()
-        return cursor.rowcount > 0
+        def delete():
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "DELETE FROM password_history WHERE id = ?",
+                (entry_id,),
+            )
+            self.conn.commit()
+            return cursor.rowcount > 0
 
-    def clear_history(self, days: Optional[int] = None):
-        """Clear password history. If days is provided, only clear entries older than that."""
-        cursor = self.conn.cursor()
+        return self._with_retry(delete)
+
+    def clear_history(self, days: Optional[int] = None) -> int:
+        """Clear password history. If days is provided, only clear entries older than that.
+
+        Returns the number of entries removed.
+        """
         if days is not None:
-            cutoff = datetime.now() - timedelta(days=days)
-            cursor.execute(
-                "DELETE FROM password_history WHERE created_at < ?",
-                (cutoff.isoformat(),),
+            return self.apply_retention(RetentionPolicy(max_age_days=days))
+        return self._purge("SELECT id FROM password_history LIMIT ?", ())
+
+    def apply_retention(
+        self,
+        policy: RetentionPolicy,
+        batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+        pause: float = 0.0,
+    ) -> int:
+        """Delete the oldest entries outside ``policy`` and return how many were removed.
+
+        Rows go in ``batch_size`` transactions, oldest first, with ``pause``
+        seconds between them; statistics stay consistent through the delete
+        triggers, and freed pages are returned to the filesystem as it goes
+        when the database uses incremental auto-vacuum.
+        """
+        removed = 0
+        if policy.max_age_days is not None:
+            removed += self._purge(
+                """
+                SELECT id FROM password_history
+                WHERE created_at < DATETIME('now', ?)
+                ORDER BY created_at, id
+                LIMIT ?
+                """,
+                (f"-{policy.max_age_days} days",),
+                batch_size,
+                pause,
             )
-        else:
-            cursor.execute("DELETE FROM password_history")
-        self.conn.commit()
+        if policy.max_rows is not None:
+            excess = self.count_history() - policy.max_rows
+            if excess > 0:
+                removed += self._purge(
+                    "SELECT id FROM password_history ORDER BY created_at, id LIMIT ?",
+                    (),
+                    batch_size,
+                    pause,
+                    limit=excess,
+                )
+        return removed
+
+    def _purge(
+        self,
+        select_ids: str,
+        params: tuple,
+        batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+        pause: float = 0.0,
+        limit: Optional[int] = None,
+    ) -> int:
+        """Repeatedly delete the ids ``select_ids`` returns (its last parameter is the batch size)."""
+        incremental = self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        removed = 0
+        while limit is None or removed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - removed)
+
+            def delete():
+                with self.conn:
+                    return self.conn.execute(
+                        f"DELETE FROM password_history WHERE id IN ({select_ids})",
+                        params + (size,),
+                    ).rowcount
+
+            deleted = self._with_retry(delete)
+            removed += deleted
+            if incremental:
+                # Each step of this pragma frees one page and execute() only
+                # steps once; executescript runs it to completion.
+                self._with_retry(lambda: self.conn.executescript("PRAGMA incremental_vacuum;"))
+            if deleted < size:
+                break
+            if pause:
+                time.sleep(pause)
+        return removed
+
+    def count_history(self) -> int:
+        """Return the number of history entries (from the maintained totals)."""
+        return self.conn.execute("SELECT total FROM history_totals WHERE id = 1").fetchone()[0]
+
+    def vacuum(self, enable_incremental: bool = False):
+        """Rebuild the database file, optionally switching it to incremental auto-vacuum.
+
+        This rewrites the whole file and blocks writers while it runs, so it is
+        meant for a one-off conversion of databases created before retention
+        purges reclaimed space.
+        """
+        if enable_incremental:
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._with_retry(lambda: self.conn.execute("VACUUM"))
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get password generation statistics."""
+        """Get password generation statistics from the maintained aggregates."""
         cursor = self.conn.cursor()
 
-        # Get basic stats
+        totals = cursor.execute(
+            "SELECT total, length_sum, last_generated FROM history_totals WHERE id = 1"
+        ).fetchone()
+        total = totals["total"]
+
+        row = cursor.execute(
+            "SELECT length FROM length_counts ORDER BY count DESC, length LIMIT 1"
+        ).fetchone()
+        most_common_length = row["length"] if row else None
+
         cursor.execute(
             """
-            SELECT 
-                COUNT(*) as total,
-                AVG(length) as avg_length
-            FROM password_history
-        """
+            SELECT t.name, c.count
+            FROM tag_counts c
+            JOIN tags t ON t.id = c.tag_id
+            ORDER BY c.count DESC
+            LIMIT 5
+            """
         )
-        basic_stats = dict(cursor.fetchone())
-
-        # Get tag counts
-        cursor.execute("SELECT tags FROM password_history WHERE tags IS NOT NULL")
-        tag_counts = {}
-        for row in cursor.fetchall():
-            tags = json.loads(row["tags"])
-            for tag in tags:
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        popular_tags = {row["name"]: row["count"] for row in cursor.fetchall()}
 
         # Get daily generation counts for the last week
         cursor.execute(
             """
-            SELECT DATE(created_at) as day, COUNT(*) as count
-            FROM password_history
-            WHERE created_at >= DATE('now', '-7 days')
-            GROUP BY DATE(created_at)
+            SELECT day, count FROM daily_counts
+            WHERE day >= DATE('now', '-7 days')
             ORDER BY day DESC
-        """
+            """
         )
         daily_counts = {row["day"]: row["count"] for row in cursor.fetchall()}
 
+        last_generated = totals["last_generated"]
         return {
-            "total_passwords": basic_stats["total"],
-            "avg_length": round(basic_stats["avg_length"], 1),
-            "popular_tags": dict(
-                sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-            ),
+            "total_passwords": total,
+            "avg_length": round(totals["length_sum"] / total, 1) if total else 0.0,
+            "most_common_length": most_common_length,
+            "last_generated": datetime.fromisoformat(last_generated) if last_generated else None,
+            "popular_tags": popular_tags,
             "daily_generation": daily_counts,
         }
+
+
+_FLUSH = object()
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Persist history entries from a background thread in group commits.
+
+    ``put`` only enqueues. A daemon thread with its own connection commits
+    entries in batches, at most ``flush_interval`` seconds after the first
+    one of a batch arrived (sooner once ``batch_size`` are waiting). With
+    ``max_pending`` entries queued, ``put`` blocks until the writer catches
+    up. ``close`` flushes what is left, and runs at interpreter exit if the
+    caller never got to it. Once a commit fails, its error is raised from
+    every later ``put``, ``flush`` and ``close``, so lost rows are never
+    reported as saved.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        profile: Optional[ConnectionProfile] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.db_path = db_path
+        self.profile = profile
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="history-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, entry: Dict[str, Any], timeout: Optional[float] = None):
+        """Queue an entry (same keys as ``add_password``).
+
+        Blocks while the queue is full; raises ``queue.Full`` if that lasts
+        longer than ``timeout`` seconds.
+        """
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        self._queue.put(entry, timeout=timeout)
+
+    def flush(self):
+        """Block until every entry queued so far is committed.
+
+        After ``close`` everything is already committed, so this only
+        re-raises a stored error.
+        """
+        if self._closed:
+            self._raise_error()
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Commit everything still queued and stop the writer thread."""
+        if self._closed:
+            self._raise_error()
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        try:
+            db = PasswordDatabase(self.db_path, self.profile)
+        except Exception as e:
+            # Keep draining so callers blocked in put/flush are released
+            self._error = e
+            db = None
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                taken = 0
+                deadline = None
+                while len(batch) < self.batch_size:
+                    if deadline is None:
+                        item = self._queue.get()
+                        deadline = time.monotonic() + self.flush_interval
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = self._queue.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                    taken += 1
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    if item is _FLUSH:
+                        break
+                    batch.append(item)
+                try:
+                    if batch and db is not None:
+                        db.add_passwords(batch, batch_size=self.batch_size)
+                except Exception as e:
+                    # The first failure is the one reported
+                    if self._error is None:
+                        self._error = e
+                finally:
+                    for _ in range(taken):
+                        self._queue.task_done()
+        finally:
+            if db is not None:
+                db.close()
@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+EXPORT_FORMATS = ("jsonl", "csv")
+EXPORT_FIELDS = ("id", "created_at", "password_hash", "length", "description", "tags", "config")
+
+
+def _record(row) -> Dict[str, Any]:
+    """Turn a history row into an export record with decoded tags and config."""
+    return {
+        "id": row["id"],
+        "created_at": row["created_at"],
+        "password_hash": row["password_hash"],
+        "length": row["length"],
+        "description": row["description"],
+        "tags": json.loads(row["tags"]) if row["tags"] else [],
+        "config": json.loads(row["config"]) if row["config"] else None,
+    }
+
+
+def open_export_stream(output: Optional[Path], compress: bool = False) -> TextIO:
+    """Open ``output`` (stdout when None) for text, gzip-compressed if requested."""
+    if output is None:
+        if compress:
+            return io.TextIOWrapper(
+                gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb"), encoding="utf-8", newline=""
+            )
+        return sys.stdout
+    if compress:
+        return gzip.open(output, "wt", encoding="utf-8", newline="")
+    return open(output, "w", encoding="utf-8", newline="")
+
+
+def export_history(
+    db,
+    stream: TextIO,
+    fmt: str = "jsonl",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    tag: Optional[str] = None,
+) -> int:
+    """Stream matching history rows, oldest first, to ``stream`` and return the count.
+
+    Rows come from ``db.iter_history`` a page at a time and are written as
+    they arrive, so memory use does not depend on how many rows match.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}"
+        )
+    csv_writer = None
+    if fmt == "csv":
+        csv_writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+        csv_writer.writeheader()
+
+    count = 0
+    for row in db.iter_history(tag=tag, since=since, until=until, oldest_first=True):
+        record = _record(row)
+        if csv_writer is not None:
+            csv_writer.writerow(
+                {
+                    **record,
+                    "description": record["description"] or "",
+                    "tags": ";".join(record["tags"]),
+                    "config": row["config"] or "",
+                }
+            )
+        else:
+            stream.write(json.dumps(record) + "\n")
+        count += 1
+    return count
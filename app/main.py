@@ -1,23 +1,32 @@
-import os
-import secrets
-import string
+import sys
 import typer
-from rich.console import Console
-from rich.table import Table
 from datetime import datetime
 from typing import List, Optional
-from app.database import PasswordDatabase
-from app.password_strength import PasswordStrengthAnalyzer
-from colorama import Fore, Style, init
 from pathlib import Path
-import hashlib
-import json
 
-init(autoreset=True)
+# Heavy modules (rich, zxcvbn, sqlite3, the breach/audit machinery) are
+# imported inside the commands that use them, so scripted calls such as
+# `generate --no-history` start quickly.
+
 app = typer.Typer(
     help="Advanced Password Generator with validation and enhanced options."
 )
-console = Console()
+
+
+class _LazyConsole:
+    """Stand-in for a Rich console that imports rich on first use."""
+
+    _console = None
+
+    def __getattr__(self, name):
+        if self._console is None:
+            from rich.console import Console
+
+            type(self)._console = Console()
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
 
 # Initialize database lazily to allow mocking in tests
 db = None
@@ -25,6 +34,8 @@ db = None
 def get_db():
     global db
     if db is None:
+        from app.database import PasswordDatabase
+
         db = PasswordDatabase()
     return db
 
@@ -73,6 +84,11 @@ def generate(
         "--output-file",
         help="File to save the generated passwords.",
     ),
+    output_format: str = typer.Option(
+        "text",
+        "--format",
+        help="Output file format: 'text' (one password per line) or 'jsonl' (with metadata).",
+    ),
     description: str = typer.Option(
         None,
         "-d",
@@ -90,11 +106,46 @@ def generate(
     save_history: bool = typer.Option(
         True, "--no-history", help="Don't save to password history.", is_flag=True
     ),
+    history_batch_size: int = typer.Option(
+        1000, "--history-batch-size", help="History rows written per database transaction."
+    ),
+    write_behind: bool = typer.Option(
+        False,
+        "--write-behind",
+        help="Save history from a background thread instead of blocking generation.",
+    ),
+    flush_interval: float = typer.Option(
+        1.0,
+        "--flush-interval",
+        min=0.0,
+        help="With --write-behind, the longest history entries wait before being committed (seconds).",
+    ),
     check_strength: bool = typer.Option(
         False, "-c", "--check-strength", help="Analyze password strength after generation."
     ),
+    workers: int = typer.Option(
+        1, "-w", "--workers", help="Number of worker processes for generation and analysis."
+    ),
+    breach_index: str = typer.Option(
+        None, "--breach-index", help="Regenerate any password found in this breach index."
+    ),
+    bloom_filter: str = typer.Option(
+        None, "--bloom-filter", help="Regenerate any password matching this breach/banned-list filter."
+    ),
 ):
     """Generate secure passwords with customizable rules and options."""
+    import string
+
+    from app.breach import open_screen, replace_breached
+    from app.output import OUTPUT_FORMATS, PasswordWriter
+    from ciphersmith.policy import (
+        DEFAULT_SPECIALS,
+        SIMILAR_CHARS,
+        CharClass,
+        get_policy,
+        standard_classes,
+    )
+
     try:
         if not any([total_length, numbers, lowercase, uppercase, special_chars]):
             total_length = 12  # Default length
@@ -103,65 +154,137 @@ def generate(
             console.print("[red]Invalid configuration! Total length or sum of counts must be at least 1.")
             raise typer.Exit(code=0)
         
-        base_digits = "23456789" if exclude_similar else string.digits
-        base_lowercase = "abcdefghjkmnpqrstuvwxyz" if exclude_similar else string.ascii_lowercase
-        base_uppercase = "ABCDEFGHJKLMNPQRSTUVWXYZ" if exclude_similar else string.ascii_uppercase
-        base_specials = "!@#$%^&*()-_=+[]{}|;:,.<>?/~" if not no_specials else ""
+        if output_file and output_format not in OUTPUT_FORMATS:
+            console.print(f"[red]Invalid format '{output_format}'. Choose from: {', '.join(OUTPUT_FORMATS)}.")
+            raise typer.Exit(code=0)
 
-        passwords = []
-        analyzer = PasswordStrengthAnalyzer() if check_strength else None
-
-        for _ in range(amount):
-            if total_length:
-                pool = base_digits + base_lowercase + base_uppercase
-                if not no_specials:
-                    pool += base_specials
-                password = "".join(secrets.choice(pool) for _ in range(total_length))
-            else:
-                password_parts = (
-                    [secrets.choice(base_digits) for _ in range(numbers)]
-                    + [secrets.choice(base_lowercase) for _ in range(lowercase)]
-                    + [secrets.choice(base_uppercase) for _ in range(uppercase)]
-                    + [secrets.choice(base_specials) for _ in range(special_chars)]
+        screen = open_screen(breach_index, bloom_filter) if workers <= 1 else None
+        analyzer = None
+        if check_strength and workers <= 1:
+            from app.password_strength import PasswordStrengthAnalyzer
+
+            # replace_breached already screens every password, so the analyzer doesn't
+            analyzer = PasswordStrengthAnalyzer()
+        config = {
+            "exclude_similar": exclude_similar,
+            "no_specials": no_specials,
+            "composition": {
+                "total_length": total_length,
+                "numbers": numbers,
+                "lowercase": lowercase,
+                "uppercase": uppercase,
+                "special_chars": special_chars,
+            },
+        }
+
+        if total_length:
+            classes = standard_classes(specials=not no_specials)
+        else:
+            classes = tuple(
+                CharClass(name, chars, count, count)
+                for name, chars, count in (
+                    ("digits", string.digits, numbers),
+                    ("lowercase", string.ascii_lowercase, lowercase),
+                    ("uppercase", string.ascii_uppercase, uppercase),
+                    ("specials", "" if no_specials else DEFAULT_SPECIALS, special_chars),
                 )
-                random.shuffle(password_parts)
-                password = "".join(password_parts)
+                if count
+            )
+        policy = get_policy(
+            total_length or numbers + lowercase + uppercase + special_chars,
+            classes,
+            exclude=SIMILAR_CHARS if exclude_similar else "",
+        )
 
-            passwords.append(password)
+        if workers > 1:
+            from app.parallel import iter_parallel_passwords
+
+            # Workers generate (and score) chunks; only this process touches the database
+            results = iter_parallel_passwords(
+                amount,
+                workers,
+                policy,
+                check_strength=check_strength,
+                breach_index_path=breach_index,
+                bloom_filter_path=bloom_filter,
+            )
+        else:
+            results = (
+                (p, None) for p in replace_breached(policy.iter_passwords(amount), policy, screen)
+            )
 
+        # Stream straight to disk when writing a file so memory stays flat
+        passwords = []
+        history = []
+        tier_counts = {"screen": 0, "fast": 0, "full": 0}
+        history_queue = None
+        writer = PasswordWriter(output_file, output_format, policy=config) if output_file else None
+        try:
             if save_history:
-                password_hash = hashlib.sha256(password.encode()).hexdigest()
-                config = {
-                    "exclude_similar": exclude_similar,
-                    "no_specials": no_specials,
-                    "composition": {
-                        "total_length": total_length,
-                        "numbers": numbers,
-                        "lowercase": lowercase,
-                        "uppercase": uppercase,
-                        "special_chars": special_chars,
-                    },
-                }
-                get_db().add_password(
-                    password_hash=password_hash,
-                    length=len(password),
-                    config=json.dumps(config),
-                    description=description,
-                    tags=tags,
-                )
-
-            if check_strength:
-                console.print(f"\n[bold]Password: [cyan]{password}")
-                analyzer.analyze(password)
-
-        if output_file:
-            output_file.write_text("\n".join(passwords))
-            if verbose:
-                console.print(f"[green]Passwords saved to {output_file}")
-        else:
-            if not check_strength:
-                for password in passwords:
-                    console.print(f"[cyan]{password}")
+                import hashlib
+                import json
+
+                config_json = json.dumps(config)
+                if write_behind:
+                    history_queue = get_db().write_behind(
+                        flush_interval=flush_interval, batch_size=history_batch_size
+                    )
+
+            for password, analysis in results:
+                if save_history:
+                    entry = {
+                        "password_hash": hashlib.sha256(password.encode()).hexdigest(),
+                        "length": len(password),
+                        "config": config_json,
+                        "description": description,
+                        "tags": tags,
+                    }
+                    if history_queue is not None:
+                        history_queue.put(entry)
+                    else:
+                        history.append(entry)
+                    if len(history) >= history_batch_size:
+                        get_db().add_passwords(history, batch_size=history_batch_size)
+                        history.clear()
+
+                if check_strength:
+                    console.print(f"\n[bold]Password: [cyan]{password}")
+                    if analysis is None:
+                        analysis = analyzer.analyze(password, policy=policy)
+                    tier_counts[analysis.tier] += 1
+
+                if writer:
+                    writer.write(password, score=analysis.score if analysis else None)
+                else:
+                    passwords.append(password)
+
+            # Print before the finally block waits for the tail of a write-behind queue
+            if not writer and not check_strength:
+                if sys.stdout.isatty():
+                    for password in passwords:
+                        console.print(f"[cyan]{password}")
+                else:
+                    # Plain lines when piped: no rich import and no line wrapping
+                    sys.stdout.write("".join(f"{password}\n" for password in passwords))
+        finally:
+            # Persist whatever was generated, even if the run was interrupted
+            try:
+                if history:
+                    get_db().add_passwords(history, batch_size=history_batch_size)
+                if writer:
+                    writer.close()
+            finally:
+                if history_queue is not None:
+                    history_queue.close()
+
+        if writer and verbose:
+            console.print(f"[green]{writer.count} passwords saved to {output_file}")
+
+        if verbose and check_strength:
+            console.print(
+                f"Strength tiers: {tier_counts['screen']} screened, "
+                f"{tier_counts['fast']} fast (entropy), {tier_counts['full']} full (zxcvbn)"
+            )
 
         if verbose:
             console.print("[green]Password generation completed successfully!")
@@ -174,17 +297,48 @@ def generate(
 
 @app.command()
 def check(
-    password: str = typer.Argument(..., help="Password to analyze"),
+    password: str = typer.Argument(None, help="Password to analyze"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed analysis"),
+    input_file: str = typer.Option(
+        None, "-i", "--input", help="Audit a file with one password per line ('-' for stdin)."
+    ),
+    output_file: Path = typer.Option(
+        None, "-o", "--output-file", help="File for batch results (default: stdout)."
+    ),
+    output_format: str = typer.Option(
+        "jsonl", "--format", help="Batch result format: 'jsonl' or 'csv'."
+    ),
+    workers: int = typer.Option(
+        1, "-w", "--workers", help="Number of worker processes for batch analysis."
+    ),
+    breach_index: str = typer.Option(
+        None, "--breach-index", help="Also look passwords up in this offline breach index."
+    ),
+    bloom_filter: str = typer.Option(
+        None, "--bloom-filter", help="Pre-screen passwords with this breach/banned-list filter."
+    ),
 ):
     """Analyze password strength with detailed feedback."""
     try:
-        analyzer = PasswordStrengthAnalyzer()
+        if input_file:
+            audit(input_file, output_file, output_format, workers, breach_index, bloom_filter)
+            return
+
+        if password is None:
+            console.print("[red]Provide a password or --input FILE.")
+            raise typer.Exit(code=0)
+
+        from app.breach import open_screen
+        from app.password_strength import PasswordStrengthAnalyzer
+
+        analyzer = PasswordStrengthAnalyzer(screen=open_screen(breach_index, bloom_filter))
         analysis = analyzer.analyze(password)
         
         # Display basic strength info
         console.print(f"\n[bold]Password Strength Analysis:[/bold]")
         console.print(f"Score: {analysis.score}/4")
+        if analysis.breached is not None:
+            console.print(f"Breached: {'[red]Yes' if analysis.breached else '[green]No'}")
         console.print(f"Crack Time: {analysis.crack_time_seconds:.2f} seconds")
         console.print(f"Feedback: {', '.join(analysis.feedback)}")
         
@@ -198,14 +352,167 @@ def check(
         console.print(f"[red]Error analyzing password: {str(e)}")
         raise typer.Exit(code=0)
 
+def audit(
+    input_file: str,
+    output_file: Optional[Path],
+    output_format: str,
+    workers: int,
+    breach_index: Optional[str] = None,
+    bloom_filter: Optional[str] = None,
+):
+    """Stream a batch strength audit and print aggregate histograms."""
+    from rich.console import Console
+    from rich.table import Table
+
+    from app.audit import AUDIT_FORMATS, AuditSummary, AuditWriter, audit_passwords
+
+    if output_format not in AUDIT_FORMATS:
+        console.print(f"[red]Invalid format '{output_format}'. Choose from: {', '.join(AUDIT_FORMATS)}.")
+        raise typer.Exit(code=0)
+
+    stream = open(output_file, "w", encoding="utf-8", newline="") if output_file else sys.stdout
+    # Keep the summary off stdout when results are written there
+    summary_console = console if output_file else Console(stderr=True)
+    summary = AuditSummary()
+    try:
+        writer = AuditWriter(stream, output_format)
+        records = audit_passwords(
+            input_file,
+            workers=workers,
+            breach_index_path=breach_index,
+            bloom_filter_path=bloom_filter,
+        )
+        for record in records:
+            writer.write(record)
+            summary.add(record)
+    finally:
+        if output_file:
+            stream.close()
+        else:
+            stream.flush()
+
+    table = Table(title=f"Audited {summary.total} passwords")
+    table.add_column("Score", style="cyan")
+    table.add_column("Count", justify="right", style="magenta")
+    for score, count in summary.scores.items():
+        table.add_row(f"{score}/4", str(count))
+    summary_console.print(table)
+
+    table = Table(title="Crack Time")
+    table.add_column("Bucket", style="cyan")
+    table.add_column("Count", justify="right", style="magenta")
+    for label, count in summary.crack_times.items():
+        table.add_row(label, str(count))
+    summary_console.print(table)
+
+    if breach_index or bloom_filter:
+        summary_console.print(f"Breached: {summary.breached} of {summary.total}")
+
+@app.command("build-breach-index")
+def build_breach_index_command(
+    source: str = typer.Argument(..., help="Breach dump with one HASH[:count] per line ('-' for stdin)."),
+    output: Path = typer.Argument(..., help="Index file to write."),
+    algorithm: str = typer.Option("sha1", "--algorithm", help="Hash algorithm of the dump: 'sha1' or 'ntlm'."),
+    prefix_bytes: int = typer.Option(8, "--prefix-bytes", help="Bytes of each hash to keep in the index."),
+    plaintext: bool = typer.Option(False, "--plaintext", help="Source lists plaintext passwords instead of hashes."),
+):
+    """Build an offline breached-password index from a hash dump."""
+    from app.breach import ALGORITHMS, build_breach_index
+
+    try:
+        if algorithm not in ALGORITHMS:
+            console.print(f"[red]Invalid algorithm '{algorithm}'. Choose from: {', '.join(ALGORITHMS)}.")
+            raise typer.Exit(code=0)
+        count = build_breach_index(
+            source, str(output), algorithm=algorithm, prefix_bytes=prefix_bytes, plaintext=plaintext
+        )
+        console.print(f"[green]Indexed {count} hashes into {output}")
+
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error building breach index: {str(e)}")
+        raise typer.Exit(code=0)
+
+@app.command("build-bloom-filter")
+def build_bloom_filter_command(
+    source: str = typer.Argument(..., help="Password list with one entry per line ('-' for stdin)."),
+    output: Path = typer.Argument(..., help="Filter file to write."),
+    fp_rate: float = typer.Option(0.001, "--fp-rate", help="Target false-positive rate."),
+    capacity: int = typer.Option(
+        None, "--capacity", help="Expected number of entries (required for stdin; counted otherwise)."
+    ),
+    casefold: bool = typer.Option(False, "--casefold", help="Match passwords case-insensitively."),
+):
+    """Build a Bloom filter pre-screen from a breach or banned-password list."""
+    from app.bloom import BloomFilter, build_bloom_filter
+
+    try:
+        count = build_bloom_filter(source, str(output), fp_rate=fp_rate, capacity=capacity, casefold=casefold)
+        with BloomFilter(str(output)) as bloom:
+            stats = bloom.stats()
+        console.print(
+            f"[green]Added {count} entries to {output} "
+            f"({stats['size_bytes']} bytes, {stats['hashes']} hashes, "
+            f"expected false-positive rate {stats['expected_fp_rate']:.6f})"
+        )
+
+    except Exception as e:
+        console.print(f"[red]Error building Bloom filter: {str(e)}")
+        raise typer.Exit(code=0)
+
+@app.command("verify-bloom-filter")
+def verify_bloom_filter_command(
+    path: Path = typer.Argument(..., help="Filter file to verify."),
+    samples: int = typer.Option(100000, "-n", "--samples", help="Random passwords to test."),
+):
+    """Measure a Bloom filter's false-positive rate against random passwords."""
+    from rich.table import Table
+
+    from app.bloom import BloomFilter
+
+    try:
+        with BloomFilter(str(path)) as bloom:
+            stats = bloom.stats()
+            measured = bloom.measure_fp_rate(samples)
+
+        table = Table(title=f"Bloom Filter {path}")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="magenta")
+        table.add_row("Entries", str(stats["items"]))
+        table.add_row("Size (bytes)", str(stats["size_bytes"]))
+        table.add_row("Hash Functions", str(stats["hashes"]))
+        table.add_row("Expected FP Rate", f"{stats['expected_fp_rate']:.6f}")
+        table.add_row("Measured FP Rate", f"{measured:.6f} ({samples} samples)")
+        console.print(table)
+
+    except Exception as e:
+        console.print(f"[red]Error verifying Bloom filter: {str(e)}")
+        raise typer.Exit(code=0)
+
 @app.command()
 def history(
     limit: int = typer.Option(10, "-n", "--limit", help="Number of entries to show"),
     tag: str = typer.Option(None, "-t", "--tag", help="Filter by tag"),
+    page: int = typer.Option(1, "--page", min=1, help="Page of --limit entries to show"),
+    after: Optional[int] = typer.Option(
+        None, "--after", help="Show entries older than this entry ID"
+    ),
 ):
     """View password generation history."""
+    import json
+
+    from rich.table import Table
+
     try:
-        entries = get_db().get_password_history(limit=limit, tag=tag)
+        entries = get_db().iter_history(
+            tag=tag,
+            after=after,
+            offset=(page - 1) * limit if limit else 0,
+            limit=limit or None,
+        )
+        shown = 0
+        last_id = None
         table = Table(title="Password Generation History")
         table.add_column("ID", justify="right", style="cyan")
         table.add_column("Date", style="magenta")
@@ -213,18 +520,21 @@ def history(
         table.add_column("Description", style="blue")
         table.add_column("Tags", style="yellow")
         
-        if entries:
-            for entry in entries:
-                created_at = datetime.fromisoformat(entry['created_at'])
-                tags = json.loads(entry['tags']) if entry['tags'] else []
-                table.add_row(
-                    str(entry['id']),
-                    created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    str(entry['length']),
-                    entry['description'] or "",
-                    ", ".join(tags) if tags else "",
-                )
+        for entry in entries:
+            created_at = datetime.fromisoformat(entry['created_at'])
+            tags = json.loads(entry['tags']) if entry['tags'] else []
+            table.add_row(
+                str(entry['id']),
+                created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                str(entry['length']),
+                entry['description'] or "",
+                ", ".join(tags) if tags else "",
+            )
+            shown += 1
+            last_id = entry['id']
         console.print(table)
+        if limit and shown == limit:
+            console.print(f"[dim]More entries: --after {last_id}")
         return
 
     except Exception as e:
@@ -234,6 +544,8 @@ def history(
 @app.command()
 def stats():
     """Show password generation statistics."""
+    from rich.table import Table
+
     try:
         stats = get_db().get_stats()
         table = Table(title="Password Generation Statistics")
@@ -286,14 +598,81 @@ def clear(
         console.print(f"[red]Error clearing history: {str(e)}")
         raise typer.Exit(code=0)
 
+@app.command()
+def retention(
+    days: Optional[int] = typer.Option(
+        None, "-d", "--days", min=0, help="Delete entries older than this many days."
+    ),
+    max_rows: Optional[int] = typer.Option(
+        None, "--max-rows", min=0, help="Keep at most this many of the newest entries."
+    ),
+    batch_size: int = typer.Option(
+        5000, "--batch-size", min=1, help="Entries deleted per transaction."
+    ),
+    pause: float = typer.Option(
+        0.0, "--pause", min=0.0, help="Seconds to wait between batches, to give other writers room."
+    ),
+    vacuum: bool = typer.Option(
+        False,
+        "--vacuum",
+        help="Rebuild the database file once so freed space is reclaimed incrementally from now on.",
+    ),
+):
+    """Apply a retention policy to password history (suitable for cron)."""
+    from app.database import RetentionPolicy
+
+    try:
+        if days is None and max_rows is None and not vacuum:
+            console.print("[yellow]Nothing to do: pass --days and/or --max-rows.")
+            raise typer.Exit(code=1)
+
+        db = get_db()
+        count = db.apply_retention(
+            RetentionPolicy(max_age_days=days, max_rows=max_rows),
+            batch_size=batch_size,
+            pause=pause,
+        )
+        console.print(f"[green]Removed {count} entries from history.")
+        if vacuum:
+            db.vacuum(enable_incremental=True)
+            console.print("[green]Database rebuilt with incremental auto-vacuum.")
+
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error applying retention policy: {str(e)}")
+        raise typer.Exit(code=1)
+
 @app.command()
 def search(
     query: str = typer.Argument(..., help="Search query"),
     limit: int = typer.Option(10, "-n", "--limit", help="Number of entries to show"),
+    page: int = typer.Option(1, "--page", min=1, help="Page of --limit entries to show"),
+    after: Optional[int] = typer.Option(
+        None, "--after", help="Continue after this entry ID (printed below each full page)"
+    ),
 ):
-    """Search password history by description or tags."""
+    """Search password history by description or tags.
+
+    The most recent matches are listed best first; older matches follow,
+    newest first, with a note saying how many matches were ranked.
+    """
+    import json
+
+    from rich.table import Table
+
+    from app.database import SEARCH_RANK_WINDOW
+
     try:
-        entries = get_db().search_passwords(query, limit=limit)
+        db = get_db()
+        entries = list(
+            db.iter_search(
+                query,
+                after=after,
+                offset=(page - 1) * limit if limit else 0,
+                limit=limit or None,
+            )
+        )
         if not entries:
             console.print("[yellow]No matching entries found.")
             return
@@ -306,20 +685,71 @@ def search(
         table.add_column("Tags", style="yellow")
 
         for entry in entries:
+            created_at = datetime.fromisoformat(entry['created_at'])
+            tags = json.loads(entry['tags']) if entry['tags'] else []
             table.add_row(
-                str(entry.id),
-                entry.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                str(entry.length),
-                entry.description or "",
-                ", ".join(entry.tags) if entry.tags else "",
+                str(entry['id']),
+                created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                str(entry['length']),
+                entry['description'] or "",
+                ", ".join(tags) if tags else "",
             )
 
         console.print(table)
+        if any(entry['rank'] is None for entry in entries):
+            console.print(
+                f"[dim]Matches older than the newest {SEARCH_RANK_WINDOW} are listed newest first, unranked."
+            )
+        if limit and len(entries) == limit:
+            console.print(f"[dim]More matches: --after {entries[-1]['id']}")
 
     except Exception as e:
         console.print(f"[red]Error searching passwords: {str(e)}")
         raise typer.Exit(code=0)
 
+@app.command("export-history")
+def export_history_command(
+    output_file: Path = typer.Option(
+        None, "-o", "--output-file", help="File to write (default: stdout)."
+    ),
+    output_format: str = typer.Option("jsonl", "--format", help="Export format: 'jsonl' or 'csv'."),
+    compress: bool = typer.Option(False, "--gzip", help="Gzip-compress the output."),
+    since: datetime = typer.Option(
+        None, "--since", help="Only entries created at or after this UTC date/time."
+    ),
+    until: datetime = typer.Option(
+        None, "--until", help="Only entries created before this UTC date/time."
+    ),
+    tag: str = typer.Option(None, "-t", "--tag", help="Only entries with this tag."),
+):
+    """Stream password history to JSONL or CSV, oldest first."""
+    from rich.console import Console
+
+    from app.export import EXPORT_FORMATS, export_history, open_export_stream
+
+    if output_format not in EXPORT_FORMATS:
+        console.print(f"[red]Invalid format '{output_format}'. Choose from: {', '.join(EXPORT_FORMATS)}.")
+        raise typer.Exit(code=0)
+
+    # Keep the summary off stdout when the export goes there
+    summary_console = console if output_file else Console(stderr=True)
+    try:
+        stream = open_export_stream(output_file, compress)
+        try:
+            count = export_history(
+                get_db(), stream, output_format, since=since, until=until, tag=tag
+            )
+        finally:
+            if stream is sys.stdout:
+                stream.flush()
+            else:
+                stream.close()
+        summary_console.print(f"[green]Exported {count} entries.")
+
+    except Exception as e:
+        summary_console.print(f"[red]Error exporting history: {str(e)}")
+        raise typer.Exit(code=1)
+
 @app.command()
 def delete(
     entry_id: int = typer.Argument(..., help="Entry ID to delete"),
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+OUTPUT_FORMATS = ("text", "jsonl")
+
+
+class PasswordWriter:
+    """Stream generated passwords to a file in buffered chunks."""
+
+    def __init__(
+        self,
+        path: Path,
+        fmt: str = "text",
+        policy: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 1000,
+    ):
+        """Open the output file; nothing is kept in memory beyond one chunk."""
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format '{fmt}'. Choose from: {', '.join(OUTPUT_FORMATS)}"
+            )
+        self.path = Path(path)
+        self.fmt = fmt
+        self.policy = policy
+        self.chunk_size = max(1, chunk_size)
+        self.count = 0
+        self._buffer: List[str] = []
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def write(self, password: str, score: Optional[int] = None):
+        """Queue a password, flushing the buffer once a chunk is complete."""
+        if self.fmt == "jsonl":
+            record: Dict[str, Any] = {"password": password, "length": len(password)}
+            if self.policy is not None:
+                record["policy"] = self.policy
+            if score is not None:
+                record["score"] = score
+            line = json.dumps(record)
+        else:
+            line = password
+        self._buffer.append(line + "\n")
+        self.count += 1
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered lines to disk so a partial run leaves whole records."""
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        """Flush remaining lines and close the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,105 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.breach import open_screen, replace_breached
+from ciphersmith.policy import CharsetPolicy
+
+if TYPE_CHECKING:
+    from app.password_strength import StrengthAnalysis
+
+# Passwords per task; strength analysis is far slower than generation, so
+# analyzed runs use smaller chunks to keep every worker busy.
+GENERATE_CHUNK_SIZE = 4096
+ANALYZE_CHUNK_SIZE = 256
+
+_analyzers = {}
+
+
+def get_worker_analyzer(
+    breach_index_path: Optional[str] = None, bloom_filter_path: Optional[str] = None
+):
+    """Return this worker process's analyzer, creating it on first use."""
+    key = (breach_index_path, bloom_filter_path)
+    analyzer = _analyzers.get(key)
+    if analyzer is None:
+        from app.password_strength import PasswordStrengthAnalyzer
+
+        analyzer = PasswordStrengthAnalyzer(screen=open_screen(breach_index_path, bloom_filter_path))
+        _analyzers[key] = analyzer
+    return analyzer
+
+
+def _generate_chunk(
+    policy: CharsetPolicy,
+    size: int,
+    check_strength: bool,
+    breach_index_path: Optional[str] = None,
+    bloom_filter_path: Optional[str] = None,
+) -> List[Tuple[str, Optional["StrengthAnalysis"]]]:
+    """Generate (and optionally score) one chunk of passwords in a worker.
+
+    Every worker draws from the OS CSPRNG directly, so the per-process
+    streams are independent and nothing is inherited from the parent.
+    Passwords flagged by the breach screen are regenerated.
+    """
+    passwords = policy.generate(size)
+    screen = open_screen(breach_index_path, bloom_filter_path)
+    if screen is not None:
+        passwords = list(replace_breached(passwords, policy, screen))
+
+    if check_strength:
+        # Already screened above; an unscreened analyzer skips the second lookup
+        analyzer = get_worker_analyzer()
+        return [(password, analyzer.analyze(password, policy=policy)) for password in passwords]
+    return [(password, None) for password in passwords]
+
+
+def imap_ordered(
+    func: Callable[..., List[Any]], tasks: Iterable[Tuple], workers: int
+) -> Iterator[Any]:
+    """Run ``func(*task)`` for each task in a process pool, yielding results in order.
+
+    ``func`` returns a list per task and its items are yielded one by one.
+    ``tasks`` is consumed lazily, and at most ``2 * workers`` tasks are in
+    flight so memory stays bounded however many tasks there are.
+    """
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    tasks = iter(tasks)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        exhausted = False
+        while not exhausted or pending:
+            while not exhausted and len(pending) < 2 * workers:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+                pending.append(executor.submit(func, *task))
+            if pending:
+                yield from pending.popleft().result()
+
+
+def iter_parallel_passwords(
+    amount: int,
+    workers: int,
+    policy: CharsetPolicy,
+    check_strength: bool = False,
+    chunk_size: Optional[int] = None,
+    breach_index_path: Optional[str] = None,
+    bloom_filter_path: Optional[str] = None,
+) -> Iterator[Tuple[str, Optional["StrengthAnalysis"]]]:
+    """Yield ``(password, analysis)`` pairs generated across a process pool, in order."""
+    if chunk_size is None:
+        chunk_size = ANALYZE_CHUNK_SIZE if check_strength else GENERATE_CHUNK_SIZE
+
+    def tasks():
+        remaining = amount
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            yield (policy, size, check_strength, breach_index_path, bloom_filter_path)
+            remaining -= size
+
+    return imap_ordered(_generate_chunk, tasks(), workers)
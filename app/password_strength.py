@@ -1,12 +1,11 @@
-from dataclasses import dataclass
-from typing import List, Dict
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import List, Dict, Optional
+import hashlib
+import hmac
 import re
-from rich.console import Console
-from rich.progress_bar import ProgressBar
-from rich.panel import Panel
-from rich.text import Text
+import secrets
 import math
-import zxcvbn
 
 @dataclass
 class StrengthAnalysis:
@@ -15,14 +14,103 @@ class StrengthAnalysis:
     crack_time_seconds: float
     patterns_found: List[str]
     suggestions: List[str]
+    tier: str = "full"  # "screen" if rejected by the breach screen, "fast" from policy entropy, "full" for zxcvbn
+    breached: Optional[bool] = None  # None when no breach index or filter was consulted
+
+def _copy_analysis(analysis: StrengthAnalysis, **changes) -> StrengthAnalysis:
+    """Return a copy of ``analysis`` that shares no mutable state with it."""
+    return replace(
+        analysis,
+        feedback=list(analysis.feedback),
+        patterns_found=list(analysis.patterns_found),
+        suggestions=list(analysis.suggestions),
+        **changes,
+    )
+
+# zxcvbn gives score 4 from 1e10 guesses (~33 bits). Generated passwords must
+# clear this with a wide margin before the zxcvbn pass is skipped.
+FAST_PATH_MIN_BITS = 60.0
+OFFLINE_GUESSES_PER_SECOND = 1e10
 
 class PasswordStrengthAnalyzer:
-    def __init__(self):
-        self.console = Console()
-        
-    def analyze(self, password: str) -> StrengthAnalysis:
-        """Analyze password strength using multiple criteria."""
-        # Use zxcvbn for comprehensive analysis
+    def __init__(
+        self,
+        cache_size: int = 1024,
+        fast_path_min_bits: float = FAST_PATH_MIN_BITS,
+        breach_index=None,
+        bloom_filter=None,
+        screen=None,
+    ):
+        """Create an analyzer with an LRU cache of up to ``cache_size`` results (0 disables it).
+
+        ``breach_index`` (``app.breach.BreachIndex``) and ``bloom_filter``
+        (``app.bloom.BloomFilter``), or a prebuilt ``app.breach.PasswordScreen``,
+        screen passwords before any other work; compromised passwords are
+        scored 0 without running zxcvbn.
+        """
+        self._console = None
+        if screen is None and (breach_index is not None or bloom_filter is not None):
+            from app.breach import PasswordScreen
+
+            screen = PasswordScreen(bloom_filter, breach_index)
+        self.screen = screen
+        self.fast_path_min_bits = fast_path_min_bits
+        self.tier_counts = {"screen": 0, "fast": 0, "full": 0}
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: "OrderedDict[bytes, StrengthAnalysis]" = OrderedDict()
+        # Cache keys are HMACs under a per-analyzer secret, so no plaintext
+        # password (or unsalted hash of one) is ever kept in memory.
+        self._cache_secret = secrets.token_bytes(32)
+
+    def analyze(self, password: str, policy=None) -> StrengthAnalysis:
+        """Analyze password strength using multiple criteria.
+
+        Pass the ``CharsetPolicy`` a password was generated from to allow the
+        fast entropy tier; user-supplied passwords always get full zxcvbn.
+        """
+        breached = None
+        if self.screen is not None:
+            breached = self.screen.contains(password)
+            if breached:
+                self.tier_counts["screen"] += 1
+                return StrengthAnalysis(
+                    score=0,
+                    feedback=["This password appears in a breach or banned-password list"],
+                    crack_time_seconds=0.0,
+                    patterns_found=[],
+                    suggestions=["Choose a password that has not appeared in any breach"],
+                    tier="screen",
+                    breached=True,
+                )
+
+        if policy is not None:
+            analysis = self._analyze_fast(password, policy)
+            if analysis is not None:
+                self.tier_counts["fast"] += 1
+                analysis.breached = breached
+                return analysis
+
+        key = None
+        if self.cache_size > 0:
+            key = hmac.new(self._cache_secret, password.encode(), hashlib.sha256).digest()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                # Count the hit under the tier that computed it; callers get a
+                # copy so mutating it cannot change later hits
+                self.tier_counts[cached.tier] += 1
+                return _copy_analysis(cached, breached=breached)
+            self.cache_misses += 1
+        self.tier_counts["full"] += 1
+
+        # zxcvbn loads large frequency dictionaries, so it is only imported
+        # once a password actually needs the full analysis.
+        import zxcvbn
+
+        # Use zxcvbn for comprehensive analysis; this is the only call per password
         result = zxcvbn.zxcvbn(password)
         
         # Extract core metrics
@@ -30,27 +118,76 @@ class PasswordStrengthAnalyzer:
         crack_time = result['crack_times_seconds']['offline_fast_hashing_1e10_per_second']
         
         # Analyze patterns
-        patterns = self._analyze_patterns(password)
+        patterns = self._analyze_patterns(password, result)
         
         # Generate feedback and suggestions
         feedback = self._generate_feedback(result, patterns)
         suggestions = self._generate_suggestions(result, patterns)
         
-        return StrengthAnalysis(
+        analysis = StrengthAnalysis(
             score=score,
             feedback=feedback,
-            crack_time_seconds=crack_time,
+            crack_time_seconds=float(crack_time),
             patterns_found=patterns,
-            suggestions=suggestions
+            suggestions=suggestions,
+            breached=breached,
         )
+
+        if key is not None:
+            self._cache[key] = _copy_analysis(analysis)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return analysis
+
+    def _analyze_fast(self, password: str, policy) -> Optional[StrengthAnalysis]:
+        """Score a generated password from its policy's entropy, or return None if borderline."""
+        bits = policy.entropy_bits
+        if bits < self.fast_path_min_bits or not policy.matches(password):
+            return None
+        # Structural red flags that zxcvbn would penalize
+        if re.search(r'(.)\1{2,}', password) or re.search(r'(123|abc|qwerty)', password.lower()):
+            return None
+        # Expected guesses for a uniformly random password is half the space
+        crack_time = 2 ** (bits - 1) / OFFLINE_GUESSES_PER_SECOND
+        return StrengthAnalysis(
+            score=4,
+            feedback=[],
+            crack_time_seconds=crack_time,
+            patterns_found=[],
+            suggestions=[],
+            tier="fast",
+        )
+
+    @property
+    def console(self):
+        """Rich console for ``visualize_strength``, created on first use."""
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return self._console
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return result-cache hit/miss counters and occupancy."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+        }
+
+    def clear_cache(self):
+        """Drop all cached results and reset the counters."""
+        self._cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
-    def _analyze_patterns(self, password: str) -> List[str]:
+    def _analyze_patterns(self, password: str, zxcvbn_result: Dict) -> List[str]:
         """Identify common password patterns."""
         patterns = []
         
         # Only check for patterns if the password is not already very strong
-        result = zxcvbn.zxcvbn(password)
-        if result['score'] < 4:
+        if zxcvbn_result['score'] < 4:
             if re.search(r'(\w)\1{2,}', password):
                 patterns.append("repeated_chars")
                 
@@ -111,6 +248,8 @@ class PasswordStrengthAnalyzer:
     
     def visualize_strength(self, analysis: StrengthAnalysis):
         """Display a rich visualization of password strength."""
+        from rich.progress_bar import ProgressBar
+
         # Create progress bar
         strength_percentage = (analysis.score / 4) * 100
         bar_color = {
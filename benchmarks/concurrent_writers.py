@@ -0,0 +1,90 @@
+"""Multi-process history write throughput under each connection profile.
+
+Several processes append history batches to one database at the same time,
+the way parallel provisioning jobs running ``generate`` do. Reports total
+rows per second and how many batches failed with "database is locked".
+
+Usage:
+    python benchmarks/concurrent_writers.py [--processes N] [--rows N] [--batch-size N]
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import PROFILES, PasswordDatabase  # noqa: E402
+
+
+def writer(path, profile_name, worker, rows, batch_size, start, failures):
+    """Write ``rows`` history rows in batches, counting lock failures."""
+    db = PasswordDatabase(path, PROFILES[profile_name])
+    start.wait()
+    for offset in range(0, rows, batch_size):
+        entries = [
+            {
+                "password_hash": hashlib.sha256(f"{worker}-{i}".encode()).hexdigest(),
+                "length": 16,
+                "config": {"total_length": 16},
+                "tags": ["bench"],
+            }
+            for i in range(offset, min(offset + batch_size, rows))
+        ]
+        try:
+            db.add_passwords(entries, batch_size=batch_size)
+        except sqlite3.OperationalError:
+            with failures.get_lock():
+                failures.value += 1
+    db.close()
+
+
+def run(profile_name, processes, rows, batch_size):
+    """Return ``(seconds, rows_written, failed_batches)`` for one profile."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "history.db")
+        PasswordDatabase(path, PROFILES[profile_name]).close()
+        start = multiprocessing.Event()
+        failures = multiprocessing.Value("i", 0)
+        workers = [
+            multiprocessing.Process(
+                target=writer,
+                args=(path, profile_name, n, rows, batch_size, start, failures),
+            )
+            for n in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        time.sleep(0.5)  # let every worker open its connection first
+        began = time.perf_counter()
+        start.set()
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - began
+
+        db = PasswordDatabase(path, PROFILES[profile_name])
+        written = db.conn.execute("SELECT COUNT(*) FROM password_history").fetchone()[0]
+        db.close()
+    return elapsed, written, failures.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per process.")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'seconds':>10}{'rows':>10}{'rows/s':>12}{'failed batches':>16}")
+    for name in ("legacy", "default"):
+        elapsed, written, failed = run(name, args.processes, args.rows, args.batch_size)
+        print(f"{name:<10}{elapsed:>10.2f}{written:>10}{written / elapsed:>12.0f}{failed:>16}")
+
+
+if __name__ == "__main__":
+    main()
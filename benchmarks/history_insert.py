@@ -0,0 +1,97 @@
+"""History insert throughput: per-row commits vs. batched transactions.
+
+The write-behind row reports how long the caller was blocked enqueueing
+(the latency ``generate --write-behind`` adds) and the total time until
+the queue was closed and everything committed.
+
+Usage:
+    python benchmarks/history_insert.py [--rows N] [--batch-size N]
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import DEFAULT_BATCH_SIZE, PasswordDatabase  # noqa: E402
+
+CONFIG = {"exclude_similar": False, "composition": {"total_length": 16}}
+
+
+def make_entries(rows):
+    """Build ``rows`` history entries like the ones ``generate`` writes."""
+    return [
+        {
+            "password_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+            "length": 16,
+            "config": CONFIG,
+            "description": "benchmark",
+            "tags": ["bench"],
+        }
+        for i in range(rows)
+    ]
+
+
+def bench_single(path, entries):
+    """Insert with one add_password call (and commit) per row."""
+    db = PasswordDatabase(path)
+    start = time.perf_counter()
+    for entry in entries:
+        db.add_password(**entry)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def bench_batched(path, entries, batch_size):
+    """Insert through add_passwords."""
+    db = PasswordDatabase(path)
+    start = time.perf_counter()
+    db.add_passwords(entries, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def bench_write_behind(path, entries, batch_size):
+    """Queue through write_behind; return (caller seconds, seconds until committed)."""
+    db = PasswordDatabase(path)
+    start = time.perf_counter()
+    history = db.write_behind(batch_size=batch_size)
+    for entry in entries:
+        history.put(entry)
+    queued = time.perf_counter() - start
+    history.close()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return queued, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="Rows to insert.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    entries = make_entries(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        single = bench_single(str(Path(tmp) / "single.db"), entries)
+        batched = bench_batched(str(Path(tmp) / "batched.db"), entries, args.batch_size)
+        queued, behind = bench_write_behind(
+            str(Path(tmp) / "behind.db"), entries, args.batch_size
+        )
+
+    print(f"{'mode':<22}{'seconds':>10}{'rows/s':>14}")
+    print(f"{'add_password':<22}{single:>10.3f}{args.rows / single:>14.0f}")
+    print(f"{'add_passwords':<22}{batched:>10.3f}{args.rows / batched:>14.0f}")
+    print(f"{'write_behind (caller)':<22}{queued:>10.3f}{args.rows / queued:>14.0f}")
+    print(f"{'write_behind (total)':<22}{behind:>10.3f}{args.rows / behind:>14.0f}")
+    print(f"speedup: {single / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
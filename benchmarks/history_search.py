@@ -0,0 +1,78 @@
+"""History search latency: LIKE scan vs. the FTS5 index, as history grows.
+
+Usage:
+    python benchmarks/history_search.py [--rows N ...] [--queries N]
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import PasswordDatabase  # noqa: E402
+
+WORDS = ["bank", "mail", "vpn", "router", "staging", "prod", "billing", "wiki", "ci", "backup"]
+# Common words match 10-20% of rows each; "hostN" matches a handful.
+COMMON_QUERIES = ["bank", "rout", "prod vpn"]
+RARE_QUERIES = ["host4242", "host777", "wiki host91"]
+
+LIKE_SQL = """
+    SELECT * FROM password_history
+    WHERE LOWER(description) LIKE LOWER(?) OR LOWER(tags) LIKE LOWER(?)
+    ORDER BY created_at DESC LIMIT 10
+"""
+
+
+def populate(db, rows):
+    """Add ``rows`` entries with descriptions and tags drawn from WORDS."""
+    db.add_passwords(
+        {
+            "password_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+            "length": 16,
+            "config": {},
+            "description": f"{WORDS[i % 10]} {WORDS[i * 7 % 10]} host{i}",
+            "tags": [WORDS[i * 3 % 10]],
+        }
+        for i in range(rows)
+    )
+
+
+def median_ms(func, queries, runs):
+    """Median milliseconds of ``func(query)`` over ``runs`` calls cycling through ``queries``."""
+    samples = []
+    for i in range(runs):
+        query = queries[i % len(queries)]
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=25)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'query':>8}{'LIKE ms':>12}{'FTS5 ms':>12}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = PasswordDatabase(str(Path(tmp) / "history.db"))
+            populate(db, rows)
+            for label, queries in (("common", COMMON_QUERIES), ("rare", RARE_QUERIES)):
+                like = median_ms(
+                    lambda q: db.conn.execute(LIKE_SQL, (f"%{q}%", f"%{q}%")).fetchall(),
+                    queries,
+                    args.queries,
+                )
+                fts = median_ms(lambda q: db.search_passwords(q, limit=10), queries, args.queries)
+                print(f"{rows:>10}{label:>8}{like:>12.2f}{fts:>12.2f}")
+            db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cold-start budget check for the CLI entry points.
+
+Runs common commands in fresh interpreters and exits non-zero when the
+median wall time of any command exceeds its budget, so regressions in
+import-time work are caught before they reach shell scripts.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--scale FACTOR]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (name, argv after the interpreter, budget in milliseconds)
+COMMANDS = [
+    ("import app.main", ["-c", "import app.main"], 250),
+    ("import ciphersmith.cli", ["-c", "import ciphersmith.cli"], 150),
+    ("generate --no-history", ["-m", "app.main", "generate", "--no-history"], 300),
+    ("generate", ["-m", "app.main", "generate"], 400),
+    ("history", ["-m", "app.main", "history"], 500),
+    ("ciphersmith menu", ["-m", "ciphersmith.cli"], 200),
+]
+
+
+def time_command(argv, env, runs, stdin=None):
+    """Return the median wall time in milliseconds of ``runs`` cold starts."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable] + argv,
+            cwd=ROOT,
+            env=env,
+            input=stdin,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per command.")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply every budget (for slow machines)."
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        # Isolate the history database and vault from the user's own
+        env = dict(os.environ, HOME=home, USERPROFILE=home)
+        print(f"{'command':<26}{'median ms':>12}{'budget ms':>12}")
+        for name, argv, budget in COMMANDS:
+            stdin = b"0\n" if argv[-1] == "ciphersmith.cli" else None
+            elapsed = time_command(argv, env, args.runs, stdin=stdin)
+            limit = budget * args.scale
+            status = "ok" if elapsed <= limit else "OVER BUDGET"
+            failed |= elapsed > limit
+            print(f"{name:<26}{elapsed:>12.1f}{limit:>12.0f}  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
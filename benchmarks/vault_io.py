@@ -0,0 +1,89 @@
+"""Whole-vault save and load: one Fernet token vs. the segmented AEAD stream.
+
+Reports time and peak Python memory (tracemalloc) for each, beyond the
+in-memory vault dict itself.
+
+Usage:
+    python benchmarks/vault_io.py [--entries N ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ciphersmith.encryption import Encryptor  # noqa: E402
+from ciphersmith.storage import read_encrypted_json, write_atomic, write_encrypted_json  # noqa: E402
+
+
+def make_passwords(entries):
+    """Build ``entries`` vault entries with a few hundred bytes of notes each."""
+    return {
+        f"service-{i}": {
+            "username": f"user{i}",
+            "password": f"pw-{i:08d}",
+            "url": f"https://example{i}.com",
+            "notes": "note " * 60,
+            "history": [f"pw-{i:08d}"],
+        }
+        for i in range(entries)
+    }
+
+
+def fernet_save(path, encryptor, passwords):
+    write_atomic(path, encryptor.encrypt(json.dumps(passwords)))
+
+
+def fernet_load(path, encryptor):
+    with open(path, "rb") as f:
+        return json.loads(encryptor.decrypt(f.read()))
+
+
+def stream_save(path, encryptor, passwords):
+    with open(path, "wb") as f:
+        write_encrypted_json(f, encryptor, passwords)
+
+
+def stream_load(path, encryptor):
+    with open(path, "rb") as f:
+        return read_encrypted_json(f, encryptor)
+
+
+def measure(func, *args):
+    """Return ``(ms, peak MiB)``, timing an untraced call since tracemalloc slows allocation."""
+    start = time.perf_counter()
+    func(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    encryptor = Encryptor()
+    print(f"{'entries':>10}{'JSON MiB':>10}{'format':>8}{'save ms':>10}{'save MiB':>10}{'load ms':>10}{'load MiB':>10}")
+    for entries in args.entries:
+        passwords = make_passwords(entries)
+        size = len(json.dumps(passwords)) / (1 << 20)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "vault")
+            for label, save, load in (("fernet", fernet_save, fernet_load), ("stream", stream_save, stream_load)):
+                save_ms, save_mib = measure(save, path, encryptor, passwords)
+                load_ms, load_mib = measure(load, path, encryptor)
+                print(f"{entries:>10}{size:>10.1f}{label:>8}{save_ms:>10.0f}{save_mib:>10.1f}{load_ms:>10.0f}{load_mib:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Vault open cost: eager RecordStorage vs. LazyRecordStorage.
+
+Opens a vault of ``--entries`` entries and reports the time and peak
+Python memory (tracemalloc) to open it, then the mean time of a cold and
+a cached ``get_password``.
+
+Usage:
+    python benchmarks/vault_open.py [--entries N ...] [--lookups N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ciphersmith.record_storage import LazyRecordStorage, RecordStorage  # noqa: E402
+
+
+def fill(path, key, entries):
+    """Create a record vault holding ``entries`` entries."""
+    storage = RecordStorage(path, key)
+    storage.passwords = {
+        f"service-{i}": {
+            "username": f"user{i}",
+            "password": f"pw-{i:08d}",
+            "url": f"https://example{i}.com",
+            "notes": "",
+            "history": [f"pw-{i:08d}"],
+        }
+        for i in range(entries)
+    }
+    storage.save_database()
+    storage.close()
+
+
+def open_cost(cls, path, key):
+    """Return ``(storage, ms, peak KiB)`` for opening the vault with ``cls``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    storage = cls(path, key)
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return storage, elapsed, peak
+
+
+def lookup_ms(storage, entries, lookups):
+    """Mean milliseconds per get_password over ``lookups`` distinct services."""
+    start = time.perf_counter()
+    for i in range(lookups):
+        storage.get_password(f"service-{i * 7919 % entries}")
+    return (time.perf_counter() - start) * 1000 / lookups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--lookups", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'mode':>7}{'open ms':>10}{'peak KiB':>11}{'cold get ms':>13}{'warm get ms':>13}")
+    for entries in args.entries:
+        with tempfile.TemporaryDirectory() as tmp:
+            key = os.path.join(tmp, "master.key")
+            path = os.path.join(tmp, "records.db")
+            fill(path, key, entries)
+            for label, cls in (("eager", RecordStorage), ("lazy", LazyRecordStorage)):
+                storage, opened, peak = open_cost(cls, path, key)
+                cold = lookup_ms(storage, entries, args.lookups)
+                warm = lookup_ms(storage, entries, args.lookups)
+                storage.close()
+                print(f"{entries:>10}{label:>7}{opened:>10.1f}{peak:>11.0f}{cold:>13.3f}{warm:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Vault search latency: a linear substring scan vs. the n-gram SearchIndex.
+
+Usage:
+    python benchmarks/vault_search.py [--entries N ...] [--queries N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ciphersmith.search_index import SearchIndex  # noqa: E402
+
+WORDS = ["bank", "mail", "vpn", "router", "staging", "prod", "billing", "wiki", "ci", "backup"]
+QUERIES = {
+    "common": ["bank", "rout", "prod"],
+    "rare": ["host4242", "user777", "example91."],
+    "fuzzy": ["hots4242", "usre777", "exmaple91"],
+}
+
+
+def make_passwords(entries):
+    """Build ``entries`` vault entries with varied services, users and urls."""
+    return {
+        f"{WORDS[i % 10]}-host{i}": {
+            "username": f"user{i}",
+            "password": f"pw-{i:08d}",
+            "url": f"https://example{i}.com/{WORDS[i * 7 % 10]}",
+            "notes": WORDS[i * 3 % 10],
+            "history": [f"pw-{i:08d}"],
+        }
+        for i in range(entries)
+    }
+
+
+def scan(passwords, query):
+    """Case-insensitive substring match over every entry's text fields."""
+    query = query.casefold()
+    return [
+        service for service, entry in passwords.items()
+        if any(query in text.casefold() for text in (service, entry["username"], entry["url"], entry["notes"]))
+    ]
+
+
+def median_ms(func, queries, runs):
+    """Median milliseconds of ``func(query)`` over ``runs`` calls cycling through ``queries``."""
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        func(queries[i % len(queries)])
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'build ms':>10}{'query':>8}{'scan ms':>10}{'index ms':>10}")
+    for entries in args.entries:
+        passwords = make_passwords(entries)
+        start = time.perf_counter()
+        index = SearchIndex(passwords)
+        build = (time.perf_counter() - start) * 1000
+        for label, queries in QUERIES.items():
+            mode = "fuzzy" if label == "fuzzy" else "substring"
+            scanned = median_ms(lambda q: scan(passwords, q), queries, args.queries)
+            indexed = median_ms(lambda q: index.search(q, mode, limit=20), queries, args.queries)
+            print(f"{entries:>10}{build:>10.0f}{label:>8}{scanned:>10.2f}{indexed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
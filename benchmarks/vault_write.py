@@ -0,0 +1,76 @@
+"""Vault write cost: single-blob PasswordStorage vs. RecordStorage and JournalStorage.
+
+Fills a vault with ``--entries`` entries, then times single-entry adds,
+updates and deletes, which the blob format pays for by re-encrypting and
+rewriting the whole vault.
+
+Usage:
+    python benchmarks/vault_write.py [--entries N ...] [--ops N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ciphersmith.journal_storage import JournalStorage  # noqa: E402
+from ciphersmith.record_storage import RecordStorage  # noqa: E402
+from ciphersmith.storage import PasswordStorage  # noqa: E402
+
+
+def fill(storage, entries):
+    """Load ``entries`` entries with one bulk save."""
+    storage.passwords = {
+        f"service-{i}": {
+            "username": f"user{i}",
+            "password": f"pw-{i:08d}",
+            "url": f"https://example{i}.com",
+            "notes": "",
+            "history": [f"pw-{i:08d}"],
+        }
+        for i in range(entries)
+    }
+    storage.save_database()
+
+
+def time_ops(storage, ops):
+    """Return mean milliseconds for an add, an update and a delete."""
+    start = time.perf_counter()
+    for i in range(ops):
+        storage.add_password(f"new-{i}", "user", "secret")
+        storage.update_password(f"new-{i}", password="changed")
+        storage.delete_password(f"new-{i}")
+    return (time.perf_counter() - start) * 1000 / (ops * 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--ops", type=int, default=20, help="Add/update/delete rounds.")
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'blob ms/op':>14}{'record ms/op':>14}{'journal ms/op':>15}")
+    for entries in args.entries:
+        with tempfile.TemporaryDirectory() as tmp:
+            key = os.path.join(tmp, "master.key")
+            blob = PasswordStorage(os.path.join(tmp, "blob.db"), key)
+            fill(blob, entries)
+            records = RecordStorage(os.path.join(tmp, "records.db"), key)
+            fill(records, entries)
+            journal = JournalStorage(os.path.join(tmp, "journal.db"), key)
+            fill(journal, entries)
+            journal.wait_for_compaction()
+            blob_ms = time_ops(blob, args.ops)
+            record_ms = time_ops(records, args.ops)
+            journal_ms = time_ops(journal, args.ops)
+            records.close()
+            journal.close()
+        print(f"{entries:>10}{blob_ms:>14.2f}{record_ms:>14.2f}{journal_ms:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
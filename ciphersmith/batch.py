@@ -0,0 +1,171 @@
+"""Bulk password generation engine for CipherSmith.
+
+Passwords are produced in batches: one large block of bytes is drawn from
+``secrets.token_bytes`` per batch and mapped onto the character pool with
+rejection sampling, so every character of the pool is equally likely.
+"""
+
+import secrets
+from functools import lru_cache
+
+# Number of characters drawn from the CSPRNG per block.
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+# Number of passwords materialized at a time by ``CharsetPolicy.iter_passwords``.
+DEFAULT_BATCH_SIZE = 4096
+
+
+class ByteStream:
+    """Buffered CSPRNG bytes for drawing many small random integers.
+
+    ``secrets.randbelow`` costs a system call per draw; this reads a block
+    from ``secrets.token_bytes`` and serves draws from it instead. Create
+    one per batch rather than sharing it, so a forked worker never reuses
+    its parent's buffered bytes.
+    """
+
+    def __init__(self, block_size=4096):
+        self.block_size = block_size
+        self._buffer = b''
+        self._pos = 0
+
+    def take(self, n):
+        """Return the next ``n`` random bytes."""
+        if self._pos + n > len(self._buffer):
+            self._buffer = (self._buffer[self._pos:]
+                            + secrets.token_bytes(max(n, self.block_size)))
+            self._pos = 0
+        data = self._buffer[self._pos:self._pos + n]
+        self._pos += n
+        return data
+
+    def randbelow(self, n):
+        """Return a uniformly random integer in ``[0, n)``.
+
+        Args:
+            n (int): Exclusive upper bound (any positive int)
+
+        Returns:
+            int: Random integer
+        """
+        if n <= 1:
+            return 0
+        bits = (n - 1).bit_length()
+        nbytes = (bits + 7) // 8
+        shift = nbytes * 8 - bits
+        while True:
+            value = int.from_bytes(self.take(nbytes), 'big') >> shift
+            if value < n:
+                return value
+
+    def shuffle(self, items):
+        """Fisher-Yates shuffle a list in place.
+
+        Args:
+            items (list): Items to shuffle
+        """
+        n = len(items)
+        if n > 256:
+            for i in range(n - 1, 0, -1):
+                j = self.randbelow(i + 1)
+                items[i], items[j] = items[j], items[i]
+            return
+        # One byte per swap, rejecting values that would bias ``b % bound``
+        data = self.take(2 * n)
+        pos = 0
+        i = n - 1
+        while i > 0:
+            if pos == len(data):
+                data = self.take(n)
+                pos = 0
+            b = data[pos]
+            pos += 1
+            bound = i + 1
+            if b < 256 - 256 % bound:
+                j = b % bound
+                items[i], items[j] = items[j], items[i]
+                i -= 1
+
+
+class BatchGenerator:
+    """Generates many passwords from a single character pool."""
+
+    def __init__(self, pool):
+        """Compile the byte lookup tables for a character pool.
+
+        Args:
+            pool (str): Characters to draw from (at most 256 distinct bytes)
+        """
+        if not pool:
+            raise ValueError("Character pool must not be empty")
+        if len(pool) > 256:
+            raise ValueError("Character pool must contain at most 256 characters")
+
+        self.pool = pool
+        size = len(pool)
+        # Bytes at or above ``limit`` would bias the modulo mapping.
+        self.limit = 256 - (256 % size)
+        self.acceptance = self.limit / 256
+        self.reject = bytes(range(self.limit, 256))
+        self.ascii = all(ord(c) < 128 for c in pool)
+        if self.ascii:
+            encoded = pool.encode('ascii')
+            mapping = bytes(encoded[b % size] for b in range(self.limit))
+        else:
+            mapping = bytes(b % size for b in range(self.limit))
+        self.table = mapping + bytes(256 - self.limit)
+
+    def draw(self, count):
+        """Draw ``count`` unbiased samples from the pool.
+
+        Args:
+            count (int): Number of characters to draw
+
+        Returns:
+            str: ``count`` random characters from the pool
+        """
+        chunks = []
+        remaining = count
+        while remaining > 0:
+            # Over-draw slightly so a single block usually suffices.
+            want = min(remaining, DEFAULT_BLOCK_SIZE)
+            block = secrets.token_bytes(int(want / self.acceptance) + 16)
+            accepted = block.translate(self.table, self.reject)[:remaining]
+            chunks.append(accepted)
+            remaining -= len(accepted)
+        data = b''.join(chunks)
+        if self.ascii:
+            return data.decode('ascii')
+        pool = self.pool
+        return ''.join([pool[i] for i in data])
+
+    def generate(self, length, count=1):
+        """Generate ``count`` passwords of ``length`` characters.
+
+        Args:
+            length (int): Length of each password
+            count (int): Number of passwords
+
+        Returns:
+            list: Generated passwords
+        """
+        if length < 1:
+            raise ValueError("Password length must be at least 1")
+        if count < 1:
+            return []
+        data = self.draw(length * count)
+        return [data[i:i + length] for i in range(0, length * count, length)]
+
+
+@lru_cache(maxsize=32)
+def get_generator(pool):
+    """Return a cached ``BatchGenerator`` for a character pool.
+
+    Args:
+        pool (str): Characters to draw from
+
+    Returns:
+        BatchGenerator: Compiled generator
+    """
+    return BatchGenerator(pool)
+
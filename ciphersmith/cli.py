@@ -5,20 +5,31 @@ import sys
 from pathlib import Path
 
 from .password_generator import PasswordGenerator
-from .storage import PasswordStorage
 
 class CLI:
     """Command-line interface for CipherSmith."""
 
-    def __init__(self, storage):
+    def __init__(self, storage=None, storage_factory=None):
         """Initialize CLI with storage.
         
         Args:
-            storage (PasswordStorage): Password storage instance
+            storage (PasswordStorage, optional): Password storage instance
+            storage_factory (callable, optional): Creates the storage on first
+                use, so the vault is only opened by commands that need it
         """
-        self.storage = storage
+        if storage is None and storage_factory is None:
+            raise ValueError("Either storage or storage_factory is required")
+        self._storage = storage
+        self._storage_factory = storage_factory
         self.generator = PasswordGenerator()
 
+    @property
+    def storage(self):
+        """Password storage, opened (and decrypted) on first access."""
+        if self._storage is None:
+            self._storage = self._storage_factory()
+        return self._storage
+
     def add_password(self):
         """Add a new password entry."""
         service = input("Enter service name: ")
@@ -103,8 +114,10 @@ class CLI:
     def search_passwords(self):
         """Search password entries."""
         query = input("Enter search term: ")
-        results = self.storage.search_passwords(username=query)
-        results.extend(self.storage.search_passwords(service=query))
+        results = self.storage.find_passwords(query)
+        if not results:
+            # Nothing contains the term as typed; allow for typos
+            results = self.storage.find_passwords(query, mode='fuzzy')
 
         if results:
             print("\nSearch Results:")
@@ -120,7 +133,10 @@ class CLI:
     def export_database(self):
         """Export password database."""
         filename = input("Enter export file name: ")
-        self.storage.export_database(filename)
+        encrypted = input(
+            "Encrypt export with this vault's key? Only this key can read it back. (y/n, default n): "
+        ).lower() == 'y'
+        self.storage.export_database(filename, encrypted=encrypted)
         print(f"Database exported to {filename}")
 
     def import_database(self):
@@ -170,13 +186,25 @@ def main():
     storage_dir = Path.home() / '.ciphersmith'
     storage_dir.mkdir(exist_ok=True)
     
-    # Initialize storage with default database and key paths
+    # Storage is opened lazily: the menu appears without loading
+    # cryptography or decrypting the vault
     db_path = storage_dir / 'passwords.db'
     key_path = storage_dir / 'master.key'
-    storage = PasswordStorage(str(db_path), str(key_path))
-    
+
+    # 'journal' keeps the single-blob file as a snapshot plus an append-only journal
+    vault_format = os.environ.get('CIPHERSMITH_VAULT_FORMAT', 'records')
+
+    def open_storage():
+        if vault_format == 'journal':
+            from .journal_storage import JournalStorage
+            return JournalStorage(str(db_path), str(key_path))
+        # Older single-blob vaults are converted to per-record storage here;
+        # entries are then only decrypted when a command reads them
+        from .record_storage import open_vault
+        return open_vault(str(db_path), str(key_path), lazy=True)
+
     # Run CLI
-    cli = CLI(storage)
+    cli = CLI(storage_factory=open_storage)
     try:
         cli.run()
     except KeyboardInterrupt:
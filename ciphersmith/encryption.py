@@ -1,7 +1,173 @@
 """Encryption module for CipherSmith."""
 
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.exceptions import InvalidTag
 import base64
+import io
+import os
+import shutil
+import struct
+
+# Segmented stream format: a 16-byte header (magic, cipher id, segment size,
+# 7-byte random nonce prefix) followed by segments, each a 5-byte frame
+# header (final flag, ciphertext length) and an AEAD ciphertext. A segment's
+# nonce is the prefix, its 4-byte index and the final flag, and its
+# associated data is the stream header plus its frame header, so segments
+# cannot be reordered, truncated, extended or moved between streams.
+STREAM_MAGIC = b'CSS1'
+STREAM_HEADER = struct.Struct('>4sBI7s')
+SEGMENT_HEADER = struct.Struct('>BI')
+DEFAULT_SEGMENT_SIZE = 64 * 1024
+TAG_SIZE = 16
+
+# Stream cipher ids as stored in the header
+STREAM_CIPHERS = {
+    'aes-gcm': (1, AESGCM),
+    'chacha20-poly1305': (2, ChaCha20Poly1305),
+}
+_CIPHERS_BY_ID = {cipher_id: cls for cipher_id, cls in STREAM_CIPHERS.values()}
+
+
+def _segment_nonce(prefix, index, final):
+    """Build the 12-byte nonce for one segment."""
+    return prefix + struct.pack('>IB', index, final)
+
+
+class SegmentWriter(io.RawIOBase):
+    """Writable binary stream that encrypts into the segmented format.
+
+    Data is buffered until a full segment is available, so at most one
+    segment of plaintext is held at a time. Closing the writer emits the
+    final segment; leaving a ``with`` block on an exception does not, so an
+    interrupted write can never be read back as complete.
+    """
+
+    def __init__(self, dst, key, cipher='aes-gcm', segment_size=DEFAULT_SEGMENT_SIZE):
+        """Start a stream and write its header.
+
+        Args:
+            dst: Binary file object to write to (not closed by the writer)
+            key (bytes): 32-byte stream key
+            cipher (str, optional): One of STREAM_CIPHERS
+            segment_size (int, optional): Plaintext bytes per segment
+        """
+        super().__init__()
+        if cipher not in STREAM_CIPHERS:
+            raise ValueError(f"Unknown stream cipher: {cipher}")
+        cipher_id, cipher_cls = STREAM_CIPHERS[cipher]
+        self._dst = dst
+        self._aead = cipher_cls(key)
+        self._segment_size = segment_size
+        self._prefix = os.urandom(7)
+        self._header = STREAM_HEADER.pack(STREAM_MAGIC, cipher_id, segment_size, self._prefix)
+        self._buffer = bytearray()
+        self._index = 0
+        self._aborted = False
+        dst.write(self._header)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        """Buffer data, encrypting every complete segment."""
+        if self.closed:
+            raise ValueError("I/O operation on closed stream")
+        self._buffer += data
+        while len(self._buffer) > self._segment_size:
+            self._emit(bytes(self._buffer[:self._segment_size]), final=0)
+            del self._buffer[:self._segment_size]
+        return len(data)
+
+    def _emit(self, plaintext, final):
+        frame = SEGMENT_HEADER.pack(final, len(plaintext) + TAG_SIZE)
+        nonce = _segment_nonce(self._prefix, self._index, final)
+        self._dst.write(frame + self._aead.encrypt(nonce, plaintext, self._header + frame))
+        self._index += 1
+
+    def close(self):
+        """Write the final segment (unless aborted) and close the writer."""
+        if not self.closed and not self._aborted:
+            self._emit(bytes(self._buffer), final=1)
+            self._buffer.clear()
+        super().close()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._aborted = True
+        return super().__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        # Never finalize a stream that was abandoned without close()
+        self._aborted = True
+        super().__del__()
+
+
+class SegmentReader(io.RawIOBase):
+    """Readable binary stream that decrypts the segmented format.
+
+    Segments are authenticated one at a time as they are read. Reading
+    raises ValueError if a segment fails authentication, the stream ends
+    before its final segment, or anything follows the final segment.
+    """
+
+    def __init__(self, src, key):
+        """Read and check a stream header.
+
+        Args:
+            src: Binary file object positioned at the stream header; the
+                stream must run to its end
+            key (bytes): 32-byte stream key
+        """
+        super().__init__()
+        self._src = src
+        self._header = src.read(STREAM_HEADER.size)
+        if len(self._header) != STREAM_HEADER.size:
+            raise ValueError("Truncated stream header")
+        magic, cipher_id, self._segment_size, self._prefix = STREAM_HEADER.unpack(self._header)
+        if magic != STREAM_MAGIC or cipher_id not in _CIPHERS_BY_ID:
+            raise ValueError("Not an encrypted stream")
+        self._aead = _CIPHERS_BY_ID[cipher_id](key)
+        self._pending = b''
+        self._index = 0
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def _next_segment(self):
+        frame = self._src.read(SEGMENT_HEADER.size)
+        if len(frame) != SEGMENT_HEADER.size:
+            raise ValueError("Failed to decrypt data: stream is truncated")
+        final, size = SEGMENT_HEADER.unpack(frame)
+        if final not in (0, 1) or size > self._segment_size + TAG_SIZE:
+            raise ValueError("Failed to decrypt data: bad segment header")
+        ciphertext = self._src.read(size)
+        if len(ciphertext) != size:
+            raise ValueError("Failed to decrypt data: stream is truncated")
+        nonce = _segment_nonce(self._prefix, self._index, final)
+        try:
+            plaintext = self._aead.decrypt(nonce, ciphertext, self._header + frame)
+        except InvalidTag:
+            raise ValueError(f"Failed to decrypt data: segment {self._index} failed authentication")
+        self._index += 1
+        self._done = bool(final)
+        # The final segment must end the stream; anything after it was appended
+        if self._done and self._src.read(1):
+            raise ValueError("Failed to decrypt data: data after the final segment")
+        return plaintext
+
+    def readinto(self, buffer):
+        """Fill ``buffer`` with decrypted bytes, returning 0 at the end of the stream."""
+        while not self._pending and not self._done:
+            self._pending = self._next_segment()
+        count = min(len(buffer), len(self._pending))
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+
 
 class Encryptor:
     """Handles encryption and decryption of sensitive data."""
@@ -14,6 +180,10 @@ class Encryptor:
         """
         self.key = key if key else Fernet.generate_key()
         self.cipher_suite = Fernet(self.key)
+        # Streams use their own key, derived from the Fernet key
+        self._stream_key = HKDF(
+            algorithm=hashes.SHA256(), length=32, salt=None, info=b'ciphersmith-stream-v1'
+        ).derive(base64.urlsafe_b64decode(self.key))
 
     def encrypt(self, data):
         """Encrypt data.
@@ -45,6 +215,92 @@ class Encryptor:
         except Exception as e:
             raise ValueError(f"Failed to decrypt data: {str(e)}")
 
+    @staticmethod
+    def is_stream(data):
+        """Check whether data begins with the segmented stream header.
+
+        Args:
+            data (bytes): Leading bytes of a file or ciphertext
+
+        Returns:
+            bool: True for the segmented stream format
+        """
+        return data[:len(STREAM_MAGIC)] == STREAM_MAGIC
+
+    def stream_writer(self, dst, cipher='aes-gcm', segment_size=DEFAULT_SEGMENT_SIZE):
+        """Open a binary stream that encrypts into ``dst`` segment by segment.
+
+        Args:
+            dst: Binary file object to write to
+            cipher (str, optional): 'aes-gcm' or 'chacha20-poly1305'
+            segment_size (int, optional): Plaintext bytes per segment
+
+        Returns:
+            SegmentWriter: Writer; close it to finish the stream
+        """
+        return SegmentWriter(dst, self._stream_key, cipher, segment_size)
+
+    def stream_reader(self, src):
+        """Open a binary stream that decrypts ``src`` segment by segment.
+
+        Args:
+            src: Binary file object positioned at the stream header
+
+        Returns:
+            SegmentReader: Reader yielding the plaintext
+        """
+        return SegmentReader(src, self._stream_key)
+
+    def encrypt_stream(self, src, dst, cipher='aes-gcm', segment_size=DEFAULT_SEGMENT_SIZE):
+        """Encrypt everything read from ``src`` into ``dst``.
+
+        Args:
+            src: Binary file object to read plaintext from
+            dst: Binary file object to write the stream to
+            cipher (str, optional): 'aes-gcm' or 'chacha20-poly1305'
+            segment_size (int, optional): Plaintext bytes per segment
+        """
+        with self.stream_writer(dst, cipher, segment_size) as writer:
+            shutil.copyfileobj(src, writer, segment_size)
+
+    def decrypt_stream(self, src, dst):
+        """Decrypt a stream read from ``src`` into ``dst``.
+
+        Args:
+            src: Binary file object positioned at the stream header
+            dst: Binary file object to write plaintext to
+
+        Raises:
+            ValueError: If the stream is truncated or fails authentication
+        """
+        with self.stream_reader(src) as reader:
+            shutil.copyfileobj(reader, dst, DEFAULT_SEGMENT_SIZE)
+
+    def encrypt_file(self, src_path, dst_path, cipher='aes-gcm', segment_size=DEFAULT_SEGMENT_SIZE):
+        """Encrypt a file into the segmented stream format.
+
+        Args:
+            src_path (str): Plaintext file
+            dst_path (str): Encrypted file to create
+            cipher (str, optional): 'aes-gcm' or 'chacha20-poly1305'
+            segment_size (int, optional): Plaintext bytes per segment
+        """
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            self.encrypt_stream(src, dst, cipher, segment_size)
+
+    def decrypt_file(self, src_path, dst_path):
+        """Decrypt a segmented stream file.
+
+        Args:
+            src_path (str): Encrypted file
+            dst_path (str): Plaintext file to create
+
+        Raises:
+            ValueError: If the file is truncated or fails authentication
+        """
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            self.decrypt_stream(src, dst)
+
     def save_key(self, filename):
         """Save encryption key to file.
         
@@ -0,0 +1,188 @@
+"""Append-only journal vault storage for CipherSmith."""
+
+import json
+import os
+import shutil
+import struct
+import threading
+
+from .storage import PasswordStorage, atomic_writer, read_encrypted_json
+
+# Each journal record is a 4-byte big-endian length followed by a Fernet token.
+RECORD_HEADER = struct.Struct('>I')
+
+# Journal size (bytes) past which it is folded into a new snapshot.
+DEFAULT_COMPACT_THRESHOLD = 1 << 20
+
+
+class JournalStorage(PasswordStorage):
+    """Vault storage that appends each change to an encrypted journal.
+
+    The vault file itself is a snapshot in the single-blob format (either
+    encoding PasswordStorage reads), so existing vaults open unchanged. Every mutation is appended to
+    ``<vault>.journal`` as one length-prefixed, encrypted record and synced,
+    so a write costs one small append instead of re-encrypting the vault.
+    Loading replays the journal over the snapshot. Once the journal grows
+    past ``compact_threshold`` bytes it is folded into a new snapshot,
+    written atomically, on a background thread.
+
+    Records carry the full new value of an entry, so replaying one twice
+    is harmless; a torn record at the end of the journal (a crash during an
+    append) is dropped. A journal left over from an interrupted or failed
+    compaction is folded into the snapshot before the vault is used, and
+    is never overwritten by a later compaction.
+    """
+
+    def __init__(self, storage_file, key_file, compact_threshold=DEFAULT_COMPACT_THRESHOLD, background=True):
+        """Open (or create) a journaled vault.
+
+        Args:
+            storage_file (str): Path to the snapshot file
+            key_file (str): Path to encryption key file
+            compact_threshold (int, optional): Journal size in bytes that triggers compaction
+            background (bool, optional): Compact on a background thread instead of inline
+        """
+        self.storage_file = storage_file
+        self.key_file = key_file
+        self.journal_file = f'{storage_file}.journal'
+        # A journal being folded into a snapshot; replayed if that was interrupted
+        self.compacting_file = f'{storage_file}.journal.compacting'
+        self.compact_threshold = compact_threshold
+        self.background = background
+        self.encryptor = self._load_encryptor(key_file)
+        self._compaction = None
+        self._compaction_error = None
+
+        self.passwords = {}
+        if os.path.exists(storage_file):
+            self.load_database()
+        else:
+            self._write_snapshot_file(b'{}')
+        self._journal = open(self.journal_file, 'ab')
+
+    def _entry_changed(self, service):
+        """Append the entry's new value to the journal."""
+        self._append({'op': 'put', 'service': service, 'entry': self.passwords[service]})
+
+    def _entry_deleted(self, service):
+        """Append a deletion to the journal."""
+        self._append({'op': 'delete', 'service': service})
+
+    def save_database(self):
+        """Journal the whole vault as one record and compact (used by imports)."""
+        self._append({'op': 'replace', 'passwords': self.passwords}, compact=False)
+        self.compact(wait=not self.background)
+
+    def _append(self, record, compact=True):
+        """Encrypt a record, append it to the journal and sync it to disk."""
+        token = self.encryptor.encrypt(json.dumps(record))
+        self._journal.write(RECORD_HEADER.pack(len(token)) + token)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        if compact and self._journal.tell() >= self.compact_threshold:
+            self.compact(wait=not self.background)
+
+    def load_database(self):
+        """Load the snapshot and replay any journal records on top of it.
+
+        A leftover compacting journal is folded into a new snapshot right
+        away, so only the live journal is outstanding once loading returns.
+        """
+        with open(self.storage_file, 'rb') as f:
+            self.passwords = read_encrypted_json(f, self.encryptor)
+        for path in (self.compacting_file, self.journal_file):
+            if os.path.exists(path):
+                self._replay(path)
+        if os.path.exists(self.compacting_file):
+            self._write_snapshot_file(json.dumps(self.passwords).encode('utf-8'))
+            os.remove(self.compacting_file)
+
+    def _replay(self, path):
+        """Apply a journal file's records, truncating a torn record at its end."""
+        good = 0
+        with open(path, 'r+b') as f:
+            data = f.read()
+            while good + RECORD_HEADER.size <= len(data):
+                (size,) = RECORD_HEADER.unpack_from(data, good)
+                end = good + RECORD_HEADER.size + size
+                if end > len(data):
+                    break
+                try:
+                    record = json.loads(self.encryptor.decrypt(data[good + RECORD_HEADER.size:end]))
+                except ValueError:
+                    break
+                self._apply(record)
+                good = end
+            if good < len(data):
+                f.truncate(good)
+
+    def _apply(self, record):
+        """Apply one journal record to the in-memory vault."""
+        op = record['op']
+        if op == 'put':
+            self.passwords[record['service']] = record['entry']
+        elif op == 'delete':
+            self.passwords.pop(record['service'], None)
+        elif op == 'replace':
+            self.passwords = record['passwords']
+
+    def compact(self, wait=True):
+        """Fold the journal into a new snapshot.
+
+        The current journal is set aside and a fresh one started before the
+        snapshot is written, so appends can continue while it runs. If an
+        earlier compaction failed, its set-aside journal is still on disk
+        and the current one is appended to it rather than replacing it.
+
+        Args:
+            wait (bool, optional): Block until the new snapshot is on disk
+        """
+        self.wait_for_compaction()
+        data = json.dumps(self.passwords).encode('utf-8')
+        self._journal.close()
+        self._set_aside_journal()
+        self._journal = open(self.journal_file, 'ab')
+        self._compaction = threading.Thread(target=self._write_snapshot, args=(data,), name='vault-compaction')
+        self._compaction.start()
+        if wait:
+            self.wait_for_compaction()
+
+    def _set_aside_journal(self):
+        """Move the live journal's records into the compacting journal."""
+        if not os.path.exists(self.compacting_file):
+            os.replace(self.journal_file, self.compacting_file)
+            return
+        # Records already set aside are not in any snapshot yet; keep them ahead
+        # of the newer ones. A crash before the removal only replays records twice.
+        with open(self.journal_file, 'rb') as src, open(self.compacting_file, 'ab') as dst:
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.journal_file)
+
+    def _write_snapshot(self, data):
+        try:
+            self._write_snapshot_file(data)
+            os.remove(self.compacting_file)
+        except Exception as e:
+            self._compaction_error = e
+
+    def _write_snapshot_file(self, data):
+        """Atomically replace the snapshot with serialized vault JSON, encrypted as a stream."""
+        with atomic_writer(self.storage_file) as f:
+            with self.encryptor.stream_writer(f) as writer:
+                writer.write(data)
+
+    def wait_for_compaction(self):
+        """Block until a running compaction finishes, re-raising its error if it failed."""
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+        if self._compaction_error is not None:
+            error, self._compaction_error = self._compaction_error, None
+            raise error
+
+    def close(self):
+        """Finish any compaction and close the journal."""
+        self.wait_for_compaction()
+        self._journal.close()
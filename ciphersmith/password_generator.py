@@ -1,9 +1,10 @@
 """Password generation module for CipherSmith."""
 
-import random
 import string
 import re
 
+from .policy import CharClass, get_policy
+
 class PasswordGenerator:
     """Generates secure passwords with customizable options."""
 
@@ -25,33 +26,51 @@ class PasswordGenerator:
         Returns:
             str: Generated password
         """
-        if not any([letters, numbers, special_chars]):
-            raise ValueError("At least one character type must be selected")
+        return self.generate_many(1, length, letters, numbers, special_chars)[0]
 
-        # Create character pool based on options
-        char_pool = ""
-        if letters:
-            char_pool += self.uppercase_letters + self.lowercase_letters
-        if numbers:
-            char_pool += self.digits
-        if special_chars:
-            char_pool += self.special_chars
+    def generate_many(self, count, length=12, letters=True, numbers=True,
+                      special_chars=True):
+        """Generate several passwords with the same options in one batch.
+
+        Args:
+            count (int): Number of passwords
+            length (int): Length of each password
+            letters (bool): Include letters
+            numbers (bool): Include numbers
+            special_chars (bool): Include special characters
+
+        Returns:
+            list: Generated passwords
+        """
+        return self.policy(length, letters, numbers, special_chars).generate(count)
 
-        # Generate password
-        password = [random.choice(char_pool) for _ in range(length)]
+    def policy(self, length=12, letters=True, numbers=True, special_chars=True):
+        """Return the cached policy for the given options.
 
-        # Ensure at least one character of each selected type
+        Every selected character type is guaranteed at least one character
+        (uppercase and lowercase each count as a type when letters are on).
+
+        Args:
+            length (int): Length of the password
+            letters (bool): Include letters
+            numbers (bool): Include numbers
+            special_chars (bool): Include special characters
+
+        Returns:
+            CharsetPolicy: Compiled policy
+        """
+        if not any([letters, numbers, special_chars]):
+            raise ValueError("At least one character type must be selected")
+
+        classes = []
         if letters:
-            password[0] = random.choice(self.uppercase_letters)
-            password[1] = random.choice(self.lowercase_letters)
+            classes.append(CharClass("uppercase", self.uppercase_letters, 1))
+            classes.append(CharClass("lowercase", self.lowercase_letters, 1))
         if numbers:
-            password[2 if letters else 0] = random.choice(self.digits)
+            classes.append(CharClass("digits", self.digits, 1))
         if special_chars:
-            password[3 if letters else (1 if numbers else 0)] = random.choice(self.special_chars)
-
-        # Shuffle the password
-        random.shuffle(password)
-        return ''.join(password)
+            classes.append(CharClass("specials", self.special_chars, 1))
+        return get_policy(length, tuple(classes))
 
     def check_strength(self, password):
         """Check the strength of a password.
@@ -0,0 +1,253 @@
+"""Compiled character-set policies for CipherSmith.
+
+A ``CharsetPolicy`` is built once per configuration: it resolves the
+per-class alphabets, exclusions and custom alphabet, compiles a batch
+generator for every class and precomputes the tables needed to sample
+class counts. Passwords that satisfy the min/max rules are then produced
+in a single pass, uniformly over every valid password, with no retries
+and no characters forced into fixed positions.
+"""
+
+import string
+from bisect import bisect_right
+from functools import lru_cache
+from math import comb, log2
+from typing import NamedTuple, Optional
+
+from .batch import DEFAULT_BATCH_SIZE, ByteStream, get_generator
+
+DEFAULT_SPECIALS = "!@#$%^&*()-_=+[]{}|;:,.<>?/~"
+
+# Characters that are easily confused with one another when read aloud
+# or printed ('0'/'O', '1'/'l'/'I', ...).
+SIMILAR_CHARS = "01IOilo"
+
+
+class CharClass(NamedTuple):
+    """A named character class with composition bounds.
+
+    ``max_count`` of None means the class is only bounded by the length.
+    """
+
+    name: str
+    chars: str
+    min_count: int = 0
+    max_count: Optional[int] = None
+
+
+def _unique(chars):
+    """Drop repeated characters while keeping their first-seen order."""
+    return ''.join(dict.fromkeys(chars))
+
+
+class CharsetPolicy:
+    """Precompiled password composition policy."""
+
+    def __init__(self, length, classes, exclude="", alphabet=None):
+        """Resolve alphabets and precompute the sampling tables.
+
+        Args:
+            length (int): Password length
+            classes (tuple): ``CharClass`` entries, in priority order
+            exclude (str): Characters never to use (e.g. ``SIMILAR_CHARS``)
+            alphabet (str, optional): Custom alphabet restricting every
+                class; its characters outside all classes form an extra
+                ``other`` class
+
+        Raises:
+            ValueError: If no password can satisfy the policy
+        """
+        if length < 1:
+            raise ValueError("Password length must be at least 1")
+
+        self.length = length
+        self.exclude = exclude
+        self.alphabet = alphabet
+
+        allowed = None if alphabet is None else set(alphabet)
+        seen = set(exclude)
+        resolved = []
+        for cls in classes:
+            chars = ''.join(
+                c for c in _unique(cls.chars)
+                if c not in seen and (allowed is None or c in allowed)
+            )
+            seen.update(chars)
+            max_count = length if cls.max_count is None else min(cls.max_count, length)
+            if not chars:
+                if cls.min_count > 0:
+                    raise ValueError(f"No characters left in class '{cls.name}'")
+                continue
+            if max_count > 0:
+                resolved.append(CharClass(cls.name, chars, cls.min_count, max_count))
+        if alphabet is not None:
+            other = ''.join(c for c in _unique(alphabet) if c not in seen)
+            if other:
+                resolved.append(CharClass("other", other, 0, length))
+
+        if not resolved:
+            raise ValueError("Policy leaves no characters to choose from")
+        if sum(cls.min_count for cls in resolved) > length:
+            raise ValueError("Password length is too short for the required character classes")
+        if sum(cls.max_count for cls in resolved) < length:
+            raise ValueError("Password length exceeds the maximum character counts")
+
+        self.classes = tuple(resolved)
+        self.pool = ''.join(cls.chars for cls in self.classes)
+        self._pool_set = frozenset(self.pool)
+        self._generators = [get_generator(cls.chars) for cls in self.classes]
+
+        # Without bounds every password over the pool is valid, so the flat
+        # pool generator is already uniform over valid passwords.
+        self.unconstrained = all(
+            cls.min_count == 0 and cls.max_count >= length for cls in self.classes
+        )
+        if not self.unconstrained:
+            self._build_tables()
+
+    @property
+    def entropy_bits(self):
+        """Entropy in bits of a password drawn from this policy."""
+        if self.unconstrained:
+            return self.length * log2(len(self.pool))
+        return log2(self.combinations)
+
+    def matches(self, password):
+        """Cheaply check that ``password`` could have come from this policy.
+
+        Only length and alphabet are checked, not class counts.
+        """
+        return len(password) == self.length and set(password) <= self._pool_set
+
+    def _build_tables(self):
+        """Precompute count-sampling tables.
+
+        ``ways[i][r]`` is the number of valid fillings of ``r`` positions
+        using classes ``i..``; ``self._cumulative[i][r]`` holds the running
+        weights of every allowed count for class ``i`` given ``r`` positions
+        left, so a count is chosen with one random draw and a bisect.
+        """
+        k = len(self.classes)
+        ways = [[0] * (self.length + 1) for _ in range(k + 1)]
+        ways[k][0] = 1
+        self._cumulative = [[None] * (self.length + 1) for _ in range(k)]
+        for i in range(k - 1, -1, -1):
+            cls = self.classes[i]
+            size = len(cls.chars)
+            for r in range(self.length + 1):
+                counts = []
+                totals = []
+                total = 0
+                for c in range(cls.min_count, min(cls.max_count, r) + 1):
+                    weight = comb(r, c) * size ** c * ways[i + 1][r - c]
+                    if weight:
+                        total += weight
+                        counts.append(c)
+                        totals.append(total)
+                ways[i][r] = total
+                self._cumulative[i][r] = (counts, totals)
+        self.combinations = ways[0][self.length]
+
+    def _sample_counts(self, stream):
+        """Choose how many characters each class contributes."""
+        counts = []
+        remaining = self.length
+        for table in self._cumulative:
+            choices, totals = table[remaining]
+            c = choices[bisect_right(totals, stream.randbelow(totals[-1]))]
+            counts.append(c)
+            remaining -= c
+        return counts
+
+    def generate(self, count=1):
+        """Generate ``count`` passwords satisfying the policy.
+
+        Args:
+            count (int): Number of passwords
+
+        Returns:
+            list: Generated passwords
+        """
+        if count < 1:
+            return []
+        if self.unconstrained:
+            return get_generator(self.pool).generate(self.length, count)
+
+        stream = ByteStream()
+        plans = [self._sample_counts(stream) for _ in range(count)]
+        # Draw every class's characters for the whole batch in one block
+        columns = []
+        for i, generator in enumerate(self._generators):
+            needed = sum(plan[i] for plan in plans)
+            columns.append(generator.draw(needed) if needed else "")
+
+        offsets = [0] * len(columns)
+        passwords = []
+        for plan in plans:
+            chars = []
+            for i, c in enumerate(plan):
+                if c:
+                    chars.extend(columns[i][offsets[i]:offsets[i] + c])
+                    offsets[i] += c
+            stream.shuffle(chars)
+            passwords.append(''.join(chars))
+        return passwords
+
+    def iter_passwords(self, count, batch_size=DEFAULT_BATCH_SIZE):
+        """Lazily yield ``count`` passwords, generating them in batches.
+
+        Args:
+            count (int): Number of passwords
+            batch_size (int): Passwords generated per batch
+
+        Yields:
+            str: Generated password
+        """
+        remaining = count
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            yield from self.generate(size)
+            remaining -= size
+
+
+@lru_cache(maxsize=64)
+def get_policy(length, classes, exclude="", alphabet=None):
+    """Return a cached ``CharsetPolicy`` for the given configuration.
+
+    Args:
+        length (int): Password length
+        classes (tuple): ``CharClass`` entries
+        exclude (str): Characters never to use
+        alphabet (str, optional): Custom alphabet
+
+    Returns:
+        CharsetPolicy: Compiled policy
+    """
+    return CharsetPolicy(length, tuple(classes), exclude, alphabet)
+
+
+def standard_classes(digits=True, lowercase=True, uppercase=True, specials=True,
+                     special_chars=DEFAULT_SPECIALS, min_count=0):
+    """Build the usual digit/letter/special classes.
+
+    Args:
+        digits (bool): Include digits
+        lowercase (bool): Include lowercase letters
+        uppercase (bool): Include uppercase letters
+        specials (bool): Include special characters
+        special_chars (str): Special characters to use
+        min_count (int): Minimum characters required from each class
+
+    Returns:
+        tuple: ``CharClass`` entries
+    """
+    classes = []
+    if digits:
+        classes.append(CharClass("digits", string.digits, min_count))
+    if lowercase:
+        classes.append(CharClass("lowercase", string.ascii_lowercase, min_count))
+    if uppercase:
+        classes.append(CharClass("uppercase", string.ascii_uppercase, min_count))
+    if specials:
+        classes.append(CharClass("specials", special_chars, min_count))
+    return tuple(classes)
@@ -0,0 +1,420 @@
+"""Per-record encrypted vault storage for CipherSmith."""
+
+import base64
+import copy
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from .encryption import Encryptor
+from .journal_storage import JournalStorage
+from .search_index import SearchIndex
+from .storage import PasswordStorage, read_encrypted_json
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+# Decrypted entries kept by LazyRecordStorage, and for how long (seconds).
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_CACHE_TTL = 60.0
+
+
+class RecordStorage(PasswordStorage):
+    """Vault storage that encrypts and writes every entry as its own record.
+
+    Entries live in an SQLite table, one Fernet ciphertext per entry, keyed
+    by an HMAC of the service name so the file never holds service names in
+    the clear. Adding, updating or deleting an entry rewrites only that row
+    instead of re-encrypting the whole vault.
+    """
+
+    def __init__(self, storage_file, key_file):
+        """Open (or create) a record vault.
+
+        Args:
+            storage_file (str): Path to the SQLite vault file
+            key_file (str): Path to encryption key file
+        """
+        self.storage_file = storage_file
+        self.key_file = key_file
+        self.encryptor = self._load_encryptor(key_file)
+        self._index_key = hmac.new(
+            base64.urlsafe_b64decode(self.encryptor.key), b'ciphersmith-service-index', hashlib.sha256
+        ).digest()
+
+        self.conn = sqlite3.connect(storage_file)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                service_key BLOB PRIMARY KEY,
+                service BLOB NOT NULL,
+                entry BLOB NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+
+        self.passwords = {}
+        self.load_database()
+
+    def service_key(self, service):
+        """Keyed hash identifying a service's record.
+
+        Args:
+            service (str): Service name
+
+        Returns:
+            bytes: HMAC-SHA256 of the service name
+        """
+        return hmac.new(self._index_key, service.encode('utf-8'), hashlib.sha256).digest()
+
+    def _encrypt_record(self, service, entry):
+        """Return the ``(service_key, service, entry)`` row for an entry."""
+        return (
+            self.service_key(service),
+            self.encryptor.encrypt(service),
+            self.encryptor.encrypt(json.dumps(entry)),
+        )
+
+    def _entry_changed(self, service):
+        """Encrypt and write just this entry's record."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (service_key, service, entry) VALUES (?, ?, ?)",
+                self._encrypt_record(service, self.passwords[service]),
+            )
+
+    def _entry_deleted(self, service):
+        """Delete just this entry's record."""
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE service_key = ?", (self.service_key(service),))
+
+    def save_database(self):
+        """Rewrite every record in one transaction (used by imports and migration)."""
+        with self.conn:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.executemany(
+                "INSERT INTO entries (service_key, service, entry) VALUES (?, ?, ?)",
+                (self._encrypt_record(service, entry) for service, entry in self.passwords.items()),
+            )
+
+    def load_database(self):
+        """Decrypt every record into memory."""
+        self.passwords = {}
+        for service, entry in self.conn.execute("SELECT service, entry FROM entries"):
+            self.passwords[self.encryptor.decrypt(service)] = json.loads(self.encryptor.decrypt(entry))
+
+    def close(self):
+        """Close the vault file."""
+        self.conn.close()
+
+
+class TTLCache:
+    """Small LRU cache whose items expire ``ttl`` seconds after they are stored."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        """Create an empty cache.
+
+        Args:
+            maxsize (int, optional): Most items kept; 0 disables caching
+            ttl (float, optional): Seconds an item stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """Return a live item, or None if it is missing or expired."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store an item, evicting the least recently used one when full."""
+        if self.maxsize <= 0:
+            return
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def pop(self, key):
+        """Drop an item if present."""
+        self._items.pop(key, None)
+
+    def clear(self):
+        """Drop every item."""
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class LazyRecordStorage(RecordStorage):
+    """Record vault that decrypts entries only when they are used.
+
+    Opening the vault loads just the set of keyed service hashes; no entry
+    or service name is decrypted until an operation needs it. Looking up a
+    service reads and decrypts its one record, and a few recently used
+    entries are kept in a ``TTLCache`` so plaintext does not stay resident.
+    Operations that need every entry (listing, searching by a field other
+    than the service, exporting) stream through the records one at a
+    time without keeping them.
+    """
+
+    def __init__(self, storage_file, key_file, cache_size=DEFAULT_CACHE_SIZE, cache_ttl=DEFAULT_CACHE_TTL):
+        """Open (or create) a record vault in lazy mode.
+
+        Args:
+            storage_file (str): Path to the SQLite vault file
+            key_file (str): Path to encryption key file
+            cache_size (int, optional): Decrypted entries to keep
+            cache_ttl (float, optional): Seconds a decrypted entry is kept
+        """
+        self._cache = TTLCache(cache_size, cache_ttl)
+        self._index = set()
+        super().__init__(storage_file, key_file)
+
+    def load_database(self):
+        """Load the keyed-hash index of stored services."""
+        self.passwords = {}
+        self._index = {row[0] for row in self.conn.execute("SELECT service_key FROM entries")}
+        self._cache.clear()
+        self._search_index = None
+
+    def save_database(self):
+        """Nothing to do: every change is written as it happens."""
+
+    def clear_cache(self):
+        """Forget all decrypted entries."""
+        self._cache.clear()
+
+    def _entry(self, service):
+        """Return a copy of one decrypted entry, reading its record if it is not cached.
+
+        The cached entry itself is never handed out, so changing the result
+        cannot change what later lookups see.
+        """
+        key = self.service_key(service)
+        entry = self._cache.get(key)
+        if entry is not None:
+            return copy.deepcopy(entry)
+        row = None
+        if key in self._index:
+            row = self.conn.execute("SELECT entry FROM entries WHERE service_key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(f"Service '{service}' not found")
+        entry = json.loads(self.encryptor.decrypt(row[0]))
+        self._cache.put(key, entry)
+        return copy.deepcopy(entry)
+
+    def _store(self, service, entry):
+        """Encrypt and write one entry, keeping the index and cache current."""
+        row = self._encrypt_record(service, entry)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (service_key, service, entry) VALUES (?, ?, ?)", row
+            )
+        self._index.add(row[0])
+        self._cache.put(row[0], copy.deepcopy(entry))
+        if self._search_index is not None:
+            self._search_index.add(service, entry)
+
+    def _iter_entries(self):
+        """Yield ``(service, entry)`` for every record without caching them."""
+        for service, entry in self.conn.execute("SELECT service, entry FROM entries"):
+            yield self.encryptor.decrypt(service), json.loads(self.encryptor.decrypt(entry))
+
+    def add_password(self, service, username, password, url="", notes=""):
+        """Add a new password entry, writing only its record."""
+        self._store(service, {
+            "username": username,
+            "password": password,
+            "url": url,
+            "notes": notes,
+            "history": [password]
+        })
+
+    def get_password(self, service):
+        """Get password entry for a service, decrypting only that record.
+
+        The entry is a copy; change it with update_password.
+
+        Raises:
+            KeyError: If service not found
+        """
+        return self._entry(service)
+
+    def update_password(self, service, **kwargs):
+        """Update password entry, rewriting only its record.
+
+        Raises:
+            KeyError: If service not found
+        """
+        entry = self._entry(service)
+        for key, value in kwargs.items():
+            if key == 'password':
+                entry['history'].append(value)
+            entry[key] = value
+        self._store(service, entry)
+
+    def delete_password(self, service):
+        """Delete password entry.
+
+        Raises:
+            KeyError: If service not found
+        """
+        key = self.service_key(service)
+        with self.conn:
+            deleted = self.conn.execute("DELETE FROM entries WHERE service_key = ?", (key,)).rowcount
+        if not deleted:
+            raise KeyError(service)
+        self._index.discard(key)
+        self._cache.pop(key)
+        if self._search_index is not None:
+            self._search_index.remove(service)
+
+    def list_services(self):
+        """List all services, decrypting only the service names."""
+        return [self.encryptor.decrypt(service) for (service,) in self.conn.execute("SELECT service FROM entries")]
+
+    def search_passwords(self, **kwargs):
+        """Search password entries.
+
+        A ``service`` criterion is answered from the index with a single
+        record read; other criteria decrypt each record in turn.
+        """
+        if 'service' in kwargs:
+            try:
+                candidates = [(kwargs['service'], self._entry(kwargs['service']))]
+            except KeyError:
+                return []
+        else:
+            candidates = self._iter_entries()
+        criteria = {k: v for k, v in kwargs.items() if k != 'service'}
+        return [
+            {"service": service, **entry}
+            for service, entry in candidates
+            if all(entry.get(k) == v for k, v in criteria.items())
+        ]
+
+    def _search(self):
+        """Return the search index, building it from one pass over the records.
+
+        Only the indexed fields are kept, so later lookups decrypt just the
+        entries a search returns.
+        """
+        if self._search_index is None:
+            index = SearchIndex()
+            for service, entry in self._iter_entries():
+                index.add(service, entry)
+            self._search_index = index
+        return self._search_index
+
+    def get_password_history(self, service):
+        """Get password history for a service.
+
+        Raises:
+            KeyError: If service not found
+        """
+        return self._entry(service)["history"]
+
+    def export_database(self, filename, encrypted=False):
+        """Export database to file."""
+        self._write_export(filename, self._iter_entries(), encrypted)
+
+    def import_database(self, filename):
+        """Import database from file, replacing every record."""
+        passwords = self._read_import(filename)
+        with self.conn:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.executemany(
+                "INSERT INTO entries (service_key, service, entry) VALUES (?, ?, ?)",
+                (self._encrypt_record(service, entry) for service, entry in passwords.items()),
+            )
+        self.load_database()
+
+
+def is_record_vault(storage_file):
+    """Check whether a vault file uses the per-record (SQLite) format.
+
+    Args:
+        storage_file (str): Vault file path
+
+    Returns:
+        bool: True for a record vault, False for a single-blob vault
+    """
+    with open(storage_file, 'rb') as f:
+        return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+
+def migrate_blob_vault(storage_file, key_file):
+    """Convert a single-blob vault file to the per-record format in place.
+
+    If the file is a JournalStorage snapshot, its journal (and any journal
+    left by an interrupted compaction) is replayed first so no journaled
+    change is lost. The original file and journals are kept next to it
+    with a ``.bak`` suffix.
+
+    Args:
+        storage_file (str): Path to the single-blob vault
+        key_file (str): Path to its encryption key
+
+    Returns:
+        int: Number of entries migrated
+
+    Raises:
+        ValueError: If the vault cannot be decrypted with the key
+    """
+    journals = (f'{storage_file}.journal', f'{storage_file}.journal.compacting')
+    if any(os.path.exists(path) for path in journals):
+        journal = JournalStorage(storage_file, key_file, background=False)
+        passwords = journal.passwords
+        journal.close()
+    else:
+        encryptor = Encryptor(Encryptor.load_key(key_file))
+        with open(storage_file, 'rb') as f:
+            passwords = read_encrypted_json(f, encryptor)
+
+    temp_file = f'{storage_file}.migrating'
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+    records = RecordStorage(temp_file, key_file)
+    try:
+        records.passwords = passwords
+        records.save_database()
+    finally:
+        records.close()
+    os.replace(storage_file, f'{storage_file}.bak')
+    os.replace(temp_file, storage_file)
+    for path in journals:
+        if os.path.exists(path):
+            os.replace(path, f'{path}.bak')
+    return len(passwords)
+
+
+def open_vault(storage_file, key_file, lazy=False):
+    """Open a vault as RecordStorage, migrating a single-blob vault file first.
+
+    Args:
+        storage_file (str): Vault file path
+        key_file (str): Encryption key file path
+        lazy (bool, optional): Decrypt entries on demand (LazyRecordStorage)
+
+    Returns:
+        RecordStorage: The opened vault
+    """
+    if os.path.exists(storage_file) and os.path.getsize(storage_file) and not is_record_vault(storage_file):
+        migrate_blob_vault(storage_file, key_file)
+    if lazy:
+        return LazyRecordStorage(storage_file, key_file)
+    return RecordStorage(storage_file, key_file)
@@ -0,0 +1,210 @@
+"""In-memory search index over vault entries for CipherSmith."""
+
+import math
+import re
+from collections import defaultdict
+
+# Indexed entry fields, with the weight a match in each one contributes to ranking.
+FIELD_WEIGHTS = {
+    'service': 4,
+    'username': 3,
+    'url': 2,
+    'notes': 1,
+}
+
+SEARCH_MODES = ('substring', 'prefix', 'fuzzy')
+
+# Share of a query's trigrams a field must contain to count as a fuzzy match.
+FUZZY_THRESHOLD = 0.5
+
+# Words whose start and end get boundary trigrams.
+_WORD = re.compile(r'\w{2,}')
+
+# Match quality for substring and prefix modes, best first.
+EXACT, FIELD_PREFIX, WORD_PREFIX, SUBSTRING = 4, 3, 2, 1
+
+
+def _grams(text, n):
+    """Return the set of length-``n`` substrings of ``text``."""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _boundary_grams(text):
+    """Return the trigrams that mark where each word of ``text`` starts and ends.
+
+    Each word of two or more characters gives its first two characters after a
+    space and its last two before one. Short fuzzy queries depend on these: a
+    one-letter deletion leaves too few inner trigrams shared to pass the
+    threshold ("gihub" shares only "hub" with "github"), but the word's ends
+    usually survive it.
+    """
+    words = _WORD.findall(text)
+    return {' ' + word[:2] for word in words} | {word[-2:] + ' ' for word in words}
+
+
+def _fuzzy_grams(text):
+    """Return the trigrams fuzzy matching compares: inner and word-boundary ones."""
+    return _grams(text, 3) | _boundary_grams(text)
+
+
+def _word_prefix(text, query):
+    """Check whether ``query`` starts at the beginning of some word in ``text``."""
+    start = text.find(query)
+    while start != -1:
+        if start == 0 or not text[start - 1].isalnum():
+            return True
+        start = text.find(query, start + 1)
+    return False
+
+
+class SearchIndex:
+    """Case-insensitive n-gram index over service, username, url and notes.
+
+    Every 3-character substring of an entry's indexed fields maps to the set
+    of services containing it. A query looks up the posting sets for its own
+    trigrams and intersects them smallest first, so only entries sharing
+    every trigram are checked against the query text; queries shorter than
+    three characters check every entry. Fuzzy queries count shared trigrams,
+    including ones marking word boundaries, instead of requiring all of
+    them. Passwords and history are never indexed.
+    """
+
+    def __init__(self, passwords=None):
+        """Build an index.
+
+        Args:
+            passwords (dict, optional): Entries keyed by service to index
+        """
+        self._fields = {}
+        self._postings = defaultdict(set)
+        for service, entry in (passwords or {}).items():
+            self.add(service, entry)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def _terms(self, fields):
+        """Return every trigram of an entry's fields, word-boundary ones included."""
+        terms = _boundary_grams(' '.join(fields))
+        for text in fields:
+            terms |= _grams(text, 3)
+        return terms
+
+    def add(self, service, entry):
+        """Index an entry, replacing any previous version of it.
+
+        Args:
+            service (str): Service name
+            entry (dict): Password entry
+        """
+        if service in self._fields:
+            self.remove(service)
+        fields = tuple(
+            (service if name == 'service' else str(entry.get(name) or '')).casefold()
+            for name in FIELD_WEIGHTS
+        )
+        self._fields[service] = fields
+        for term in self._terms(fields):
+            self._postings[term].add(service)
+
+    def remove(self, service):
+        """Drop an entry from the index, if present.
+
+        Args:
+            service (str): Service name
+        """
+        fields = self._fields.pop(service, None)
+        if fields is None:
+            return
+        for term in self._terms(fields):
+            posting = self._postings[term]
+            posting.discard(service)
+            if not posting:
+                del self._postings[term]
+
+    def _candidates(self, query):
+        """Return services whose fields contain every trigram of ``query``."""
+        if len(query) < 3:
+            return self._fields.keys()
+        terms = _grams(query, 3)
+        postings = sorted((self._postings.get(term, set()) for term in terms), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def _fuzzy_candidates(self, query):
+        """Return ``({service: shared trigram count}, query trigrams)`` for likely fuzzy matches."""
+        terms = _fuzzy_grams(query)
+        needed = max(1, math.ceil(len(terms) * FUZZY_THRESHOLD))
+        postings = sorted((self._postings.get(term, set()) for term in terms), key=len)
+        # Sharing ``needed`` trigrams means appearing in one of the rarest
+        # ``len - needed + 1`` postings, so common ones (word starts) are only probed
+        seeds = set().union(*postings[:len(postings) - needed + 1])
+        counts = {service: sum(service in posting for posting in postings) for service in seeds}
+        return {service: count for service, count in counts.items() if count >= needed}, terms
+
+    @staticmethod
+    def _quality(text, query, prefix_only):
+        """Match quality of ``query`` in one field, or 0 if it does not match."""
+        if text == query:
+            return EXACT
+        if text.startswith(query):
+            return FIELD_PREFIX
+        if _word_prefix(text, query):
+            return WORD_PREFIX
+        if not prefix_only and query in text:
+            return SUBSTRING
+        return 0
+
+    def search(self, query, mode='substring', limit=None):
+        """Find entries matching a query, best match first.
+
+        Args:
+            query (str): Text to look for (case-insensitive)
+            mode (str, optional): 'substring', 'prefix' (start of a word) or
+                'fuzzy' (most trigrams shared, tolerating typos; queries under
+                three characters fall back to substring matching)
+            limit (int, optional): Maximum number of results
+
+        Returns:
+            list: ``(service, score)`` tuples, highest score first
+
+        Raises:
+            ValueError: If mode is not one of SEARCH_MODES
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        query = query.strip().casefold()
+        if not query:
+            return []
+
+        weights = tuple(FIELD_WEIGHTS.values())
+        scored = []
+        if mode == 'fuzzy' and len(query) >= 3:
+            candidates, terms = self._fuzzy_candidates(query)
+            for service in candidates:
+                score = 0.0
+                for text, weight in zip(self._fields[service], weights):
+                    if query in text:
+                        similarity = 1.0
+                    else:
+                        similarity = len(terms & _fuzzy_grams(text)) / len(terms)
+                    if similarity >= FUZZY_THRESHOLD:
+                        score = max(score, similarity * weight)
+                if score:
+                    scored.append((service, score))
+        else:
+            prefix_only = mode == 'prefix'
+            for service in self._candidates(query):
+                score = 0
+                for text, weight in zip(self._fields[service], weights):
+                    quality = self._quality(text, query, prefix_only)
+                    score = max(score, quality * weight)
+                if score:
+                    scored.append((service, score))
+
+        scored.sort(key=lambda item: (-item[1], len(item[0]), item[0]))
+        return scored[:limit] if limit is not None else scored
@@ -1,12 +1,207 @@
 """Storage module for CipherSmith."""
 
+import io
 import json
 import os
-from .encryption import Encryptor
+from contextlib import contextmanager
+from json.decoder import WHITESPACE
+from .encryption import Encryptor, STREAM_MAGIC
+from .search_index import SearchIndex
+
+
+@contextmanager
+def atomic_writer(path):
+    """Open a temporary file that replaces ``path`` only if the block succeeds.
+
+    A crash or exception leaves either the old or the new version in place.
+
+    Args:
+        path (str): File to write
+
+    Yields:
+        file: Binary file object to write the new contents to
+    """
+    temp_path = f'{path}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+
+
+def write_atomic(path, data):
+    """Replace a file's contents so a crash leaves either the old or the new version.
+
+    Args:
+        path (str): File to write
+        data (bytes): New contents
+    """
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+def _iter_json(obj, indent=None):
+    """Yield the same text as ``json.dumps(obj, indent=indent)`` one dict item at a time.
+
+    Each item is encoded by json.dumps, which is much faster than the pure
+    Python encoder behind JSONEncoder.iterencode.
+    """
+    if not isinstance(obj, dict):
+        yield json.dumps(obj, indent=indent)
+        return
+    yield from _iter_json_object(obj.items(), indent)
+
+
+def _iter_json_object(items, indent=None):
+    """Yield a JSON object built from ``(key, value)`` pairs, one pair at a time.
+
+    The pairs may come from a generator, so the object never has to exist
+    in memory as a whole.
+    """
+    # Raw newlines only occur between JSON tokens, so nested values can be re-indented
+    newline = '' if indent is None else '\n' + ' ' * indent
+    separator = ', ' if indent is None else ','
+    empty = True
+    for key, value in items:
+        item = json.dumps(value, indent=indent)
+        if newline:
+            item = item.replace('\n', newline)
+        yield f'{"{" if empty else separator}{newline}{json.dumps(key)}: {item}'
+        empty = False
+    if empty:
+        yield '{}'
+    else:
+        yield '\n}' if newline else '}'
+
+
+def _read_json(text, chunk_size=1 << 16):
+    """Decode JSON from a text stream, reading a top-level object one member at a time.
+
+    The reverse of _iter_json_object: only the member being decoded is held
+    as text, never the whole document. Other top-level values are read and
+    decoded in one go.
+
+    Raises:
+        ValueError: If the text is not valid JSON
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = text.read(chunk_size)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+    def peek():
+        # Skip whitespace and return the next character ('' at the end)
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            fill()
+
+    def value():
+        # A value ending exactly at the buffer's end may continue (e.g. a number)
+        nonlocal pos
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                if end < len(buf) or eof:
+                    pos = end
+                    return obj
+            fill()
+
+    if peek() != '{':
+        return json.loads(buf[pos:] + text.read())
+    pos += 1
+    result = {}
+    if peek() == '}':
+        pos += 1
+    else:
+        while True:
+            if peek() != '"':
+                raise ValueError("Expecting property name enclosed in double quotes")
+            key = value()
+            if peek() != ':':
+                raise ValueError("Expecting ':' delimiter")
+            pos += 1
+            peek()
+            result[key] = value()
+            delimiter = peek()
+            pos += 1
+            if delimiter == '}':
+                break
+            if delimiter != ',':
+                raise ValueError("Expecting ',' delimiter")
+    if peek():
+        raise ValueError("Extra data after JSON object")
+    return result
+
+
+def _write_encrypted_chunks(f, encryptor, chunks):
+    """Encrypt text chunks into ``f`` as one segmented stream."""
+    with encryptor.stream_writer(f) as writer:
+        for chunk in chunks:
+            writer.write(chunk.encode('utf-8'))
+
+
+def write_encrypted_json(f, encryptor, obj, indent=None):
+    """Encode ``obj`` as JSON and encrypt it into ``f`` in the segmented stream format.
+
+    The JSON is encrypted as it is encoded, so neither the full plaintext
+    nor the full ciphertext is ever held in memory.
+
+    Args:
+        f: Binary file object to write to
+        encryptor (Encryptor): Vault encryptor
+        obj: JSON-serializable object
+        indent (int, optional): JSON indentation
+    """
+    _write_encrypted_chunks(f, encryptor, _iter_json(obj, indent))
+
+
+def read_encrypted_json(f, encryptor):
+    """Decrypt and decode JSON written by write_encrypted_json or as one Fernet token.
+
+    Stream-format data is decrypted and decoded incrementally, so the full
+    plaintext is never held in memory; a Fernet token is decrypted whole.
+
+    Args:
+        f: Seekable binary file object at the start of the data
+        encryptor (Encryptor): Vault encryptor
+
+    Returns:
+        The decoded JSON value
+
+    Raises:
+        ValueError: If the data cannot be decrypted
+    """
+    start = f.tell()
+    head = f.read(len(STREAM_MAGIC))
+    f.seek(start)
+    if encryptor.is_stream(head):
+        with encryptor.stream_reader(f) as reader:
+            return _read_json(io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8'))
+    return json.loads(encryptor.decrypt(f.read()))
+
 
 class PasswordStorage:
     """Manages secure storage of passwords and related data."""
 
+    # Built on the first find_passwords call, for the dict it was built from
+    _search_index = None
+    _indexed = None
+
     def __init__(self, storage_file, key_file):
         """Initialize storage with file paths.
         
@@ -16,13 +211,7 @@ class PasswordStorage:
         """
         self.storage_file = storage_file
         self.key_file = key_file
-        
-        # Initialize encryption
-        if os.path.exists(key_file):
-            self.encryptor = Encryptor(Encryptor.load_key(key_file))
-        else:
-            self.encryptor = Encryptor()
-            self.encryptor.save_key(key_file)
+        self.encryptor = self._load_encryptor(key_file)
         
         # Initialize storage
         self.passwords = {}
@@ -31,6 +220,15 @@ class PasswordStorage:
         else:
             self.save_database()
 
+    @staticmethod
+    def _load_encryptor(key_file):
+        """Load the vault key, creating and saving a new one if it does not exist."""
+        if os.path.exists(key_file):
+            return Encryptor(Encryptor.load_key(key_file))
+        encryptor = Encryptor()
+        encryptor.save_key(key_file)
+        return encryptor
+
     def add_password(self, service, username, password, url="", notes=""):
         """Add a new password entry.
         
@@ -48,7 +246,8 @@ class PasswordStorage:
             "notes": notes,
             "history": [password]
         }
-        self.save_database()
+        self._reindex(service)
+        self._entry_changed(service)
 
     def get_password(self, service):
         """Get password entry for a service.
@@ -83,7 +282,8 @@ class PasswordStorage:
                 entry['history'].append(value)
             entry[key] = value
         
-        self.save_database()
+        self._reindex(service)
+        self._entry_changed(service)
 
     def delete_password(self, service):
         """Delete password entry.
@@ -95,7 +295,8 @@ class PasswordStorage:
             KeyError: If service not found
         """
         del self.passwords[service]
-        self.save_database()
+        self._reindex(service)
+        self._entry_deleted(service)
 
     def list_services(self):
         """List all services.
@@ -120,6 +321,38 @@ class PasswordStorage:
                 results.append({"service": service, **entry})
         return results
 
+    def find_passwords(self, query, mode='substring', limit=None):
+        """Search service, username, url and notes for a query, best match first.
+
+        Args:
+            query (str): Text to look for (case-insensitive)
+            mode (str, optional): 'substring', 'prefix' or 'fuzzy'
+            limit (int, optional): Maximum number of results
+
+        Returns:
+            list: Matching entries, each with its service name
+        """
+        return [
+            {"service": service, **self.get_password(service)}
+            for service, _ in self._search().search(query, mode, limit)
+        ]
+
+    def _search(self):
+        """Return the search index, rebuilding it if the vault was reloaded."""
+        if self._search_index is None or self._indexed is not self.passwords:
+            self._search_index = SearchIndex(self.passwords)
+            self._indexed = self.passwords
+        return self._search_index
+
+    def _reindex(self, service):
+        """Bring a built search index up to date with one entry."""
+        if self._search_index is None or self._indexed is not self.passwords:
+            return
+        if service in self.passwords:
+            self._search_index.add(service, self.passwords[service])
+        else:
+            self._search_index.remove(service)
+
     def get_password_history(self, service):
         """Get password history for a service.
         
@@ -134,40 +367,86 @@ class PasswordStorage:
         """
         return self.passwords[service]["history"]
 
+    def _entry_changed(self, service):
+        """Persist an added or updated entry; the single-blob format rewrites the vault.
+
+        Args:
+            service (str): Service name
+        """
+        self.save_database()
+
+    def _entry_deleted(self, service):
+        """Persist a deleted entry; the single-blob format rewrites the vault.
+
+        Args:
+            service (str): Service name
+        """
+        self.save_database()
+
     def save_database(self):
-        """Save password database to file."""
-        data = json.dumps(self.passwords)
-        encrypted_data = self.encryptor.encrypt(data)
-        with open(self.storage_file, 'wb') as f:
-            f.write(encrypted_data)
+        """Save password database to file in the segmented stream format."""
+        with atomic_writer(self.storage_file) as f:
+            write_encrypted_json(f, self.encryptor, self.passwords)
 
     def load_database(self):
-        """Load password database from file."""
-        try:
-            with open(self.storage_file, 'rb') as f:
-                encrypted_data = f.read()
-            decrypted_data = self.encryptor.decrypt(encrypted_data)
-            self.passwords = json.loads(decrypted_data)
-        except Exception as e:
-            # Initialize empty database if loading fails
+        """Load password database from file (stream or legacy Fernet format).
+
+        An empty file opens as an empty vault. A file that fails to decrypt
+        (wrong key, truncation, appended bytes) is left untouched rather than
+        replaced, so a damaged copy can still be recovered.
+
+        Raises:
+            ValueError: If the vault file cannot be decrypted or decoded
+        """
+        if not os.path.getsize(self.storage_file):
             self.passwords = {}
             self.save_database()
+            return
+        try:
+            with open(self.storage_file, 'rb') as f:
+                self.passwords = read_encrypted_json(f, self.encryptor)
+        except ValueError as e:
+            raise ValueError(f"Cannot read vault {self.storage_file}: {e}") from e
 
-    def export_database(self, filename):
+    def export_database(self, filename, encrypted=False):
         """Export database to file.
         
         Args:
             filename (str): Export file path
+            encrypted (bool, optional): Encrypt the export with the vault key
         """
-        with open(filename, 'w') as f:
-            json.dump(self.passwords, f, indent=4)
+        self._write_export(filename, self.passwords.items(), encrypted)
 
     def import_database(self, filename):
         """Import database from file.
         
         Args:
-            filename (str): Import file path
+            filename (str): Import file path (plain JSON or an encrypted export)
         """
-        with open(filename, 'r') as f:
-            self.passwords = json.load(f)
+        self.passwords = self._read_import(filename)
         self.save_database()
+
+    def _write_export(self, filename, items, encrypted):
+        """Write ``(service, entry)`` pairs as an indented JSON export, one entry at a time.
+
+        Args:
+            filename (str): Export file path
+            items: Iterable of ``(service, entry)`` pairs
+            encrypted (bool): Encrypt the export as a segmented stream
+        """
+        chunks = _iter_json_object(items, indent=4)
+        if not encrypted:
+            with open(filename, 'w') as f:
+                f.writelines(chunks)
+            return
+        with atomic_writer(filename) as f:
+            _write_encrypted_chunks(f, self.encryptor, chunks)
+
+    def _read_import(self, filename):
+        """Read an export written by _write_export, encrypted or not."""
+        with open(filename, 'rb') as f:
+            if self.encryptor.is_stream(f.read(len(STREAM_MAGIC))):
+                f.seek(0)
+                return read_encrypted_json(f, self.encryptor)
+            f.seek(0)
+            return json.loads(f.read())
@@ -33,6 +33,10 @@ setup(
         "colorama>=0.4.4",
     ],
     extras_require={
+        'test': [
+            'pytest>=7.4.0',
+            'pytest-cov>=4.1.0',
+        ],
         'dev': [
             'black>=23.0.0',
             'flake8>=6.0.0',
@@ -0,0 +1,76 @@
+"""Tests for the Bloom filter pre-screen."""
+
+import pytest
+from typer.testing import CliRunner
+
+from app.bloom import BloomFilter, build_bloom_filter, filter_parameters
+from app.breach import BreachIndex, PasswordScreen, build_breach_index
+from app.main import app
+
+
+def write_list(path, passwords):
+    path.write_text("".join(f"{p}\n" for p in passwords), encoding="utf-8")
+    return str(path)
+
+
+def test_every_listed_password_is_found(tmp_path):
+    passwords = [f"Password{i}" for i in range(500)] + ["pässwörd"]
+    source = write_list(tmp_path / "list.txt", passwords)
+
+    assert build_bloom_filter(source, str(tmp_path / "list.bloom")) == len(passwords)
+    with BloomFilter(str(tmp_path / "list.bloom")) as bloom:
+        assert len(bloom) == len(passwords)
+        assert all(bloom.contains(p) for p in passwords)
+
+
+def test_false_positive_rate_stays_near_target(tmp_path):
+    source = write_list(tmp_path / "list.txt", (f"breached-{i}" for i in range(5000)))
+    build_bloom_filter(source, str(tmp_path / "list.bloom"), fp_rate=0.01)
+
+    with BloomFilter(str(tmp_path / "list.bloom")) as bloom:
+        bits, hashes = filter_parameters(5000, 0.01)
+        assert (bloom.bits, bloom.hashes) == (bits, hashes)
+        assert bloom.expected_fp_rate() == pytest.approx(0.01, rel=0.1)
+        # 20000 samples at 1%: about 200 hits, standard deviation ~14
+        assert bloom.measure_fp_rate(20000) < 0.015
+
+
+def test_casefold_filters_ignore_case(tmp_path):
+    source = write_list(tmp_path / "list.txt", ["Secret"])
+    build_bloom_filter(source, str(tmp_path / "list.bloom"), casefold=True)
+
+    with BloomFilter(str(tmp_path / "list.bloom")) as bloom:
+        assert bloom.contains("sECRET")
+
+
+def test_other_files_are_rejected(tmp_path):
+    (tmp_path / "junk").write_bytes(b"not a filter at all, just some bytes")
+
+    with pytest.raises(ValueError):
+        BloomFilter(str(tmp_path / "junk"))
+
+
+def test_screen_confirms_filter_hits_in_the_index(tmp_path):
+    source = write_list(tmp_path / "list.txt", ["hunter2", "letmein"])
+    build_bloom_filter(source, str(tmp_path / "list.bloom"))
+    build_breach_index(source, str(tmp_path / "list.idx"), plaintext=True)
+
+    with BloomFilter(str(tmp_path / "list.bloom")) as bloom, BreachIndex(str(tmp_path / "list.idx")) as index:
+        assert PasswordScreen(bloom).contains("hunter2")
+        assert PasswordScreen(bloom, index).contains("letmein")
+        assert not PasswordScreen(bloom, index).contains("correct horse")
+        assert not PasswordScreen().contains("hunter2")
+
+
+def test_build_and_verify_commands(tmp_path):
+    source = write_list(tmp_path / "list.txt", (f"pw{i}" for i in range(1000)))
+    output = str(tmp_path / "list.bloom")
+    runner = CliRunner()
+
+    built = runner.invoke(app, ["build-bloom-filter", source, output, "--fp-rate", "0.01"])
+    verified = runner.invoke(app, ["verify-bloom-filter", output, "--samples", "2000"])
+
+    assert "Added 1000 entries" in built.output
+    assert "Measured FP Rate" in verified.output
+    with BloomFilter(output) as bloom:
+        assert bloom.contains("pw999")
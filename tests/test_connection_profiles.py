@@ -0,0 +1,34 @@
+"""Tests for choosing the history database's connection profile."""
+
+import pytest
+
+from app.database import LEGACY_PROFILE, PROFILE_ENV_VAR, PasswordDatabase
+
+
+def journal_mode(db):
+    return db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+
+def test_default_profile_uses_wal(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+
+    assert journal_mode(db) == "wal"
+    db.close()
+
+
+def test_environment_selects_the_legacy_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, "legacy")
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+
+    assert db.profile == LEGACY_PROFILE
+    assert journal_mode(db) == "delete"
+    assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    db.close()
+
+
+def test_unknown_profile_names_are_rejected(tmp_path, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, "fast")
+
+    with pytest.raises(ValueError, match="default, legacy"):
+        PasswordDatabase(str(tmp_path / "history.db"))
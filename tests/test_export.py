@@ -0,0 +1,90 @@
+"""Tests for streaming history exports."""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.database import PasswordDatabase
+from app.export import EXPORT_FIELDS, export_history, open_export_stream
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    tags = {1: ["a"], 2: ["a", "b"], 3: None}
+    with db.conn:
+        for i, day in enumerate(("2026-01-01", "2026-01-02", "2026-01-03"), start=1):
+            db.conn.execute(
+                "INSERT INTO password_history (password_hash, length, created_at, description, tags)"
+                " VALUES (?, 16, ?, ?, ?)",
+                (f"hash{i}", f"{day} 12:00:00", 'mail, "work"' if i == 2 else None,
+                 json.dumps(tags[i]) if tags[i] else None),
+            )
+        db._link_tags([1, 2], [tags[1], tags[2]])
+    db.add_password("hash4", 20, {"total_length": 20}, tags=["b"])
+    yield db
+    db.close()
+
+
+def test_jsonl_export_is_oldest_first(db):
+    out = io.StringIO()
+
+    assert export_history(db, out) == 4
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["password_hash"] for r in records] == ["hash1", "hash2", "hash3", "hash4"]
+    assert records[1]["tags"] == ["a", "b"] and records[2]["tags"] == []
+    assert records[3]["config"] == {"total_length": 20}
+    assert set(records[0]) == set(EXPORT_FIELDS)
+
+
+def test_csv_export_round_trips(db):
+    out = io.StringIO(newline="")
+
+    assert export_history(db, out, "csv", tag="a") == 2
+    rows = list(csv.DictReader(io.StringIO(out.getvalue(), newline="")))
+    assert [row["password_hash"] for row in rows] == ["hash1", "hash2"]
+    assert rows[1]["description"] == 'mail, "work"'
+    assert rows[1]["tags"] == "a;b"
+
+
+def test_date_filters(db):
+    out = io.StringIO()
+
+    count = export_history(db, out, since=datetime(2026, 1, 2), until=datetime(2026, 1, 3))
+
+    assert count == 1
+    assert json.loads(out.getvalue())["password_hash"] == "hash2"
+
+
+def test_unknown_format_is_rejected(db):
+    with pytest.raises(ValueError):
+        export_history(db, io.StringIO(), "xml")
+
+
+def test_gzip_output(db, tmp_path):
+    path = tmp_path / "history.jsonl.gz"
+    with open_export_stream(path, compress=True) as stream:
+        export_history(db, stream)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 4
+
+
+def test_rows_are_written_as_they_arrive():
+    out = io.StringIO()
+
+    class Rows:
+        def iter_history(self, **kwargs):
+            for i in range(3):
+                # Every earlier row is already written before the next is fetched
+                assert len(out.getvalue().splitlines()) == i
+                yield {
+                    "id": i, "created_at": "2026-01-01 00:00:00", "password_hash": str(i),
+                    "length": 16, "description": None, "tags": None, "config": None,
+                }
+
+    assert export_history(Rows(), out) == 3
@@ -0,0 +1,67 @@
+"""Tests for interned generation configs and the history_entries view."""
+
+import json
+
+import pytest
+
+from app.database import PasswordDatabase
+
+CONFIG = {"composition": {"total_length": 16, "numbers": 2, "uppercase": 1}, "exclude_similar": True}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+def config_rows(db):
+    return db.conn.execute("SELECT * FROM generation_configs").fetchall()
+
+
+def test_equal_configs_share_one_row(path):
+    db = PasswordDatabase(path)
+    reordered = {"exclude_similar": True, "composition": {"uppercase": 1, "numbers": 2, "total_length": 16}}
+    db.add_password("a", 16, CONFIG)
+    db.add_password("b", 16, reordered)
+    db.add_password("c", 16, json.dumps(json.dumps(CONFIG)))
+    db.add_passwords({"password_hash": str(i), "length": 16, "config": CONFIG} for i in range(5))
+    db.add_password("d", 12, {"total_length": 12})
+
+    rows = config_rows(db)
+    assert len(rows) == 2
+    first = next(row for row in rows if row["total_length"] == 16)
+    assert (first["numbers"], first["uppercase"], first["lowercase"]) == (2, 1, None)
+    assert (first["exclude_similar"], first["no_specials"]) == (1, 0)
+    db.close()
+
+
+def test_history_entries_view_returns_the_config(path):
+    db = PasswordDatabase(path)
+    db.add_password("a", 16, CONFIG, description="mail")
+    db.add_password("b", 16, None)
+
+    rows = {row["password_hash"]: row for row in db.iter_history()}
+    assert json.loads(rows["a"]["config"]) == CONFIG
+    assert rows["a"]["description"] == "mail"
+    assert rows["b"]["config"] is None
+    # Nothing is stored per row any more
+    assert db.conn.execute("SELECT COUNT(*) FROM password_history WHERE config IS NOT NULL").fetchone()[0] == 0
+    db.close()
+
+
+def test_legacy_per_row_configs_are_interned(path):
+    db = PasswordDatabase(path)
+    with db.conn:
+        db.conn.executemany(
+            "INSERT INTO password_history (password_hash, length, config) VALUES (?, 16, ?)",
+            [("a", json.dumps(CONFIG)), ("b", json.dumps(json.dumps(CONFIG))), ("c", None)],
+        )
+        db.conn.execute("PRAGMA user_version = 3")
+    db.close()
+
+    db = PasswordDatabase(path)
+    assert len(config_rows(db)) == 1
+    configs = [row["config"] for row in db.iter_history()]
+    assert [json.loads(c) if c else None for c in configs] == [None, CONFIG, CONFIG]
+    assert db.conn.execute("SELECT COUNT(*) FROM password_history WHERE config IS NOT NULL").fetchone()[0] == 0
+    db.close()
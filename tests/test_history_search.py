@@ -0,0 +1,70 @@
+"""Tests for history search ranking and paging."""
+
+import hashlib
+
+import pytest
+
+from app import database
+from app.database import PasswordDatabase
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # A small window so the tests cover both the ranked and unranked parts
+    monkeypatch.setattr(database, "SEARCH_RANK_WINDOW", 7)
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    db.add_passwords(
+        {
+            "password_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+            "length": 16,
+            "config": {},
+            "description": "bank " * (i % 3 + 1) + f"host{i}",
+            "tags": ["bench"],
+        }
+        for i in range(30)
+    )
+    yield db
+    db.close()
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_search_returns_matches_past_the_rank_window(db):
+    rows = db.search_passwords("bank")
+
+    assert sorted(ids(rows)) == list(range(1, 31))
+    assert all(row["rank"] is not None for row in rows[:7])
+    # Older matches follow unranked, newest first
+    assert ids(rows[7:]) == list(range(23, 0, -1))
+
+
+def test_after_cursor_continues_the_same_order(db):
+    expected = ids(db.iter_search("bank"))
+    seen, after = [], None
+    while True:
+        page = list(db.iter_search("bank", after=after, limit=4, page_size=3))
+        if not page:
+            break
+        seen += ids(page)
+        after = page[-1]["id"]
+
+    assert seen == expected
+
+
+def test_offset_pages_match_cursor_pages(db):
+    expected = ids(db.iter_search("bank"))
+
+    for offset in (0, 4, 8, 24):
+        page = db.iter_search("bank", offset=offset, limit=4, page_size=3)
+        assert ids(page) == expected[offset:offset + 4]
+
+
+def test_first_page_matches_search_passwords(db):
+    assert ids(db.search_passwords("bank", limit=5)) == ids(db.iter_search("bank", limit=5))
+
+
+def test_after_must_match_query(db):
+    with pytest.raises(ValueError):
+        list(db.iter_search("host3", after=30))
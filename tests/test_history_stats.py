@@ -0,0 +1,74 @@
+"""Tests for the trigger-maintained history statistics."""
+
+import hashlib
+from datetime import datetime
+
+import pytest
+
+from app.database import PasswordDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    yield db
+    db.close()
+
+
+def add(db, length, created_at, tags=None):
+    """Insert an entry with a fixed creation time; the triggers see it as written."""
+    with db.conn:
+        entry_id = db.conn.execute(
+            "INSERT INTO password_history (password_hash, length, created_at) VALUES (?, ?, ?)",
+            (hashlib.sha256(created_at.encode()).hexdigest(), length, created_at),
+        ).lastrowid
+        db._link_tags([entry_id], [tags])
+
+
+def aggregates(db):
+    return {
+        table: [tuple(row) for row in db.conn.execute(f"SELECT * FROM {table} ORDER BY 1")]
+        for table in ("history_totals", "length_counts", "daily_counts", "tag_counts")
+    }
+
+
+def assert_consistent(db):
+    maintained = aggregates(db)
+    with db.conn:
+        db._rebuild_stats()
+    assert maintained == aggregates(db)
+
+
+def test_triggers_track_inserts_and_deletes(db):
+    db.add_passwords(
+        {"password_hash": str(i), "length": 12 + i % 3, "config": {}, "tags": ["a"] if i % 2 else ["a", "b"]}
+        for i in range(20)
+    )
+    assert_consistent(db)
+
+    for entry_id in (1, 2, 3, 10):
+        db.delete_password(entry_id)
+    assert_consistent(db)
+
+    db.clear_history()
+    assert_consistent(db)
+    assert db.get_stats()["total_passwords"] == 0
+    assert db.get_stats()["popular_tags"] == {}
+
+
+def test_stats_report_the_maintained_values(db):
+    add(db, 16, "2026-01-01 10:00:00", ["work"])
+    add(db, 16, "2026-01-02 09:00:00", ["work", "home"])
+    add(db, 20, "2026-01-02 11:00:00")
+
+    stats = db.get_stats()
+    assert stats["total_passwords"] == 3
+    assert stats["avg_length"] == pytest.approx(17.3)
+    assert stats["most_common_length"] == 16
+    assert stats["last_generated"] == datetime(2026, 1, 2, 11)
+    assert stats["popular_tags"] == {"work": 2, "home": 1}
+
+    # Deleting the newest entry moves last_generated back
+    db.delete_password(3)
+    assert db.get_stats()["last_generated"] == datetime(2026, 1, 2, 9)
+    assert_consistent(db)
@@ -0,0 +1,53 @@
+"""Tests for history inserts and their tag links."""
+
+import hashlib
+
+from app.database import PasswordDatabase
+
+
+def entry(i, tags):
+    return {
+        "password_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+        "length": 16,
+        "config": {"total_length": 16},
+        "tags": tags,
+    }
+
+
+def test_batch_links_each_row_to_its_own_tags(tmp_path):
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    db.add_password(**entry(0, ["seed"]))
+    db.delete_password(1)
+    db.add_passwords(
+        [entry(i, ["even"] if i % 2 == 0 else ["odd", "x"]) for i in range(1, 11)],
+        batch_size=4,
+    )
+
+    even = {row["password_hash"] for row in db.iter_history(tag="even")}
+    odd = {row["password_hash"] for row in db.iter_history(tag="odd")}
+
+    assert even == {entry(i, None)["password_hash"] for i in range(2, 11, 2)}
+    assert odd == {entry(i, None)["password_hash"] for i in range(1, 11, 2)}
+    assert db.get_all_tags() == ["even", "odd", "x"]
+    db.close()
+
+
+def test_add_password_returns_the_new_id(tmp_path):
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    first = db.add_password(**entry(0, ["a"]))
+    second = db.add_password(**entry(1, None))
+
+    ids = [row["id"] for row in db.iter_history()]
+    assert ids == [second, first]
+    db.close()
+
+
+def test_untagged_batches_are_all_inserted(tmp_path):
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    added = db.add_passwords([entry(i, None) for i in range(10)], batch_size=4)
+
+    rows = list(db.iter_history())
+    assert added == 10
+    assert {row["password_hash"] for row in rows} == {entry(i, None)["password_hash"] for i in range(10)}
+    assert {row["config_id"] for row in rows} == {rows[0]["config_id"]} != {None}
+    db.close()
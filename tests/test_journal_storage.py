@@ -0,0 +1,84 @@
+"""Tests for the append-only journal vault."""
+
+import os
+
+import pytest
+
+from ciphersmith.journal_storage import JournalStorage
+
+
+def open_journal(tmp_path, **kwargs):
+    return JournalStorage(str(tmp_path / "vault.dat"), str(tmp_path / "master.key"), **kwargs)
+
+
+def test_changes_survive_reopening(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.add_password("svc", "user", "one")
+    journal.update_password("svc", password="two")
+    journal.add_password("gone", "user", "pw")
+    journal.delete_password("gone")
+    journal.close()
+
+    reopened = open_journal(tmp_path)
+    assert reopened.list_services() == ["svc"]
+    assert reopened.get_password_history("svc") == ["one", "two"]
+    reopened.close()
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.add_password("svc", "user", "pw")
+    journal.close()
+    with open(tmp_path / "vault.dat.journal", "ab") as f:
+        f.write(b"\x00\x00\x01\x00partial")
+
+    reopened = open_journal(tmp_path)
+    assert reopened.list_services() == ["svc"]
+    reopened.add_password("next", "user", "pw")
+    reopened.close()
+
+    assert sorted(open_journal(tmp_path).list_services()) == ["next", "svc"]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    journal = open_journal(tmp_path, compact_threshold=1, background=False)
+    journal.add_password("svc", "user", "pw")
+    journal.close()
+
+    assert (tmp_path / "vault.dat.journal").stat().st_size == 0
+    assert open_journal(tmp_path).list_services() == ["svc"]
+
+
+def fail_snapshots(monkeypatch):
+    def fail(self, data):
+        raise OSError("disk full")
+    monkeypatch.setattr(JournalStorage, "_write_snapshot_file", fail)
+
+
+def test_leftover_compacting_journal_survives_a_failed_compaction(tmp_path, monkeypatch):
+    journal = open_journal(tmp_path)
+    journal.add_password("A", "user", "pw")
+    journal.close()
+    os.replace(tmp_path / "vault.dat.journal", tmp_path / "vault.dat.journal.compacting")
+
+    journal = open_journal(tmp_path, compact_threshold=1, background=False)
+    assert not (tmp_path / "vault.dat.journal.compacting").exists()
+    fail_snapshots(monkeypatch)
+    with pytest.raises(OSError):
+        journal.add_password("B", "user", "pw")
+    journal._journal.close()
+    monkeypatch.undo()
+
+    assert sorted(open_journal(tmp_path).list_services()) == ["A", "B"]
+
+
+def test_repeated_failed_compactions_keep_every_record(tmp_path, monkeypatch):
+    journal = open_journal(tmp_path, compact_threshold=1, background=False)
+    fail_snapshots(monkeypatch)
+    for service in ("A", "B"):
+        with pytest.raises(OSError):
+            journal.add_password(service, "user", "pw")
+    journal._journal.close()
+    monkeypatch.undo()
+
+    assert sorted(open_journal(tmp_path).list_services()) == ["A", "B"]
@@ -0,0 +1,55 @@
+"""Tests for LazyRecordStorage."""
+
+import json
+
+import pytest
+
+from ciphersmith.record_storage import LazyRecordStorage
+
+
+@pytest.fixture
+def vault(tmp_path):
+    storage = LazyRecordStorage(str(tmp_path / "vault.dat"), str(tmp_path / "master.key"))
+    storage.add_password("github", "octo", "first", url="https://github.com")
+    storage.add_password("bank", "alice", "pin")
+    yield storage
+    storage.close()
+
+
+def test_changing_a_returned_entry_leaves_the_vault_alone(vault):
+    entry = vault.get_password("github")
+    entry["password"] = "tampered"
+    entry["history"].append("tampered")
+
+    assert vault.get_password("github")["password"] == "first"
+    assert vault.get_password_history("github") == ["first"]
+
+
+def test_update_records_history(vault):
+    vault.update_password("github", password="second")
+    vault.clear_cache()
+
+    assert vault.get_password("github")["history"] == ["first", "second"]
+
+
+def test_export_round_trips(vault, tmp_path):
+    plain, encrypted = str(tmp_path / "export.json"), str(tmp_path / "export.enc")
+    vault.export_database(plain)
+    vault.export_database(encrypted, encrypted=True)
+
+    with open(plain) as f:
+        exported = json.load(f)
+    assert sorted(exported) == ["bank", "github"]
+
+    vault.delete_password("bank")
+    vault.import_database(encrypted)
+    assert sorted(vault.list_services()) == ["bank", "github"]
+
+
+def test_empty_vault_exports_an_empty_object(tmp_path):
+    storage = LazyRecordStorage(str(tmp_path / "empty.dat"), str(tmp_path / "master.key"))
+    storage.export_database(str(tmp_path / "export.json"))
+    storage.close()
+
+    with open(tmp_path / "export.json") as f:
+        assert json.load(f) == {}
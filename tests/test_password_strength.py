@@ -0,0 +1,89 @@
+"""Tests for the password strength analyzer and its result cache."""
+
+import re
+
+import pytest
+
+from app.password_strength import FAST_PATH_MIN_BITS, OFFLINE_GUESSES_PER_SECOND, PasswordStrengthAnalyzer
+from ciphersmith.policy import CharsetPolicy, standard_classes
+
+
+def test_repeated_passwords_hit_the_cache():
+    analyzer = PasswordStrengthAnalyzer(cache_size=2)
+    first = analyzer.analyze("correct horse")
+    second = analyzer.analyze("correct horse")
+
+    assert second == first
+    assert analyzer.cache_info() == {"hits": 1, "misses": 1, "size": 1, "max_size": 2}
+    assert analyzer.tier_counts == {"screen": 0, "fast": 0, "full": 2}
+
+
+def test_cache_evicts_least_recently_used():
+    analyzer = PasswordStrengthAnalyzer(cache_size=2)
+    for password in ("alpha1", "bravo2", "alpha1", "charlie3", "alpha1"):
+        analyzer.analyze(password)
+
+    # bravo2 was evicted by charlie3; alpha1 stayed because it was used again
+    assert analyzer.cache_info()["hits"] == 2
+    analyzer.analyze("bravo2")
+    assert analyzer.cache_info()["misses"] == 4
+
+
+def test_mutating_a_result_does_not_change_cached_hits():
+    analyzer = PasswordStrengthAnalyzer()
+    first = analyzer.analyze("password1")
+    expected = (list(first.feedback), list(first.suggestions))
+    first.breached = True
+    first.feedback.append("changed")
+    first.suggestions.clear()
+
+    again = analyzer.analyze("password1")
+    assert again.breached is None
+    assert (again.feedback, again.suggestions) == expected
+
+
+def test_cache_can_be_disabled():
+    analyzer = PasswordStrengthAnalyzer(cache_size=0)
+    analyzer.analyze("password1")
+    analyzer.analyze("password1")
+
+    assert analyzer.cache_info()["size"] == 0
+    assert analyzer.cache_info()["hits"] == 0
+
+
+def test_generated_password_takes_the_fast_tier():
+    policy = CharsetPolicy(20, standard_classes(min_count=1))
+    analyzer = PasswordStrengthAnalyzer()
+    password = next(
+        p for p in policy.generate(50) if not re.search(r"(.)\1{2,}|123|abc|qwerty", p.lower())
+    )
+
+    analysis = analyzer.analyze(password, policy)
+
+    assert analysis.tier == "fast"
+    assert analysis.score == 4
+    assert analysis.crack_time_seconds == pytest.approx(
+        2 ** (policy.entropy_bits - 1) / OFFLINE_GUESSES_PER_SECOND
+    )
+    assert analyzer.tier_counts == {"screen": 0, "fast": 1, "full": 0}
+
+
+def test_weak_policies_and_foreign_passwords_get_full_analysis():
+    analyzer = PasswordStrengthAnalyzer()
+    short = CharsetPolicy(8, standard_classes())
+    strong = CharsetPolicy(20, standard_classes())
+
+    assert short.entropy_bits < FAST_PATH_MIN_BITS
+    assert analyzer.analyze(short.generate()[0], short).tier == "full"
+    # Not a password this policy could have produced
+    assert analyzer.analyze("x" * 19, strong).tier == "full"
+    assert analyzer.analyze("Abcdefgh12345678xyz!", strong).tier == "full"
+    assert analyzer.tier_counts["fast"] == 0
+
+
+def test_passwords_without_a_policy_get_full_analysis():
+    analyzer = PasswordStrengthAnalyzer()
+    analysis = analyzer.analyze("Tr0ub4dor&3")
+
+    assert analysis.tier == "full"
+    assert 0 <= analysis.score <= 4
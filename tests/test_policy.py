@@ -0,0 +1,80 @@
+"""Tests for compiled character-set policies."""
+
+import itertools
+from collections import Counter
+from math import log2
+
+import pytest
+
+from ciphersmith.policy import SIMILAR_CHARS, CharClass, CharsetPolicy, standard_classes
+
+SMALL = (CharClass("lower", "ab", 1), CharClass("upper", "XYZ", 1, 2))
+
+
+def class_counts(policy, password):
+    return [sum(c in cls.chars for c in password) for cls in policy.classes]
+
+
+def is_valid(policy, password):
+    counts = class_counts(policy, password)
+    return policy.matches(password) and all(
+        cls.min_count <= n <= cls.max_count for cls, n in zip(policy.classes, counts)
+    )
+
+
+def valid_passwords(policy):
+    return {
+        "".join(chars)
+        for chars in itertools.product(policy.pool, repeat=policy.length)
+        if is_valid(policy, "".join(chars))
+    }
+
+
+@pytest.mark.parametrize("length", [2, 3, 4])
+def test_count_table_matches_brute_force(length):
+    policy = CharsetPolicy(length, SMALL)
+    count = len(valid_passwords(policy))
+
+    assert policy.combinations == count
+    assert policy.entropy_bits == pytest.approx(log2(count))
+
+
+def test_unconstrained_entropy_counts_every_password():
+    policy = CharsetPolicy(3, (CharClass("lower", "ab"), CharClass("upper", "XYZ")))
+
+    assert policy.unconstrained
+    assert policy.entropy_bits == pytest.approx(log2(5 ** 3))
+
+
+def test_generated_passwords_meet_class_minimums():
+    policy = CharsetPolicy(8, standard_classes(min_count=2), exclude=SIMILAR_CHARS)
+
+    for password in policy.generate(500):
+        assert all(n >= 2 for n in class_counts(policy, password))
+        assert not set(password) & set(SIMILAR_CHARS)
+
+
+def test_matches_agrees_with_generate():
+    policy = CharsetPolicy(12, standard_classes(min_count=1))
+    other = CharsetPolicy(12, standard_classes(specials=False))
+
+    assert all(policy.matches(p) for p in policy.iter_passwords(300, batch_size=64))
+    assert not policy.matches(policy.generate()[0][:-1])
+    assert not other.matches("!" * 12)
+
+
+def test_sampling_is_uniform_over_valid_passwords():
+    policy = CharsetPolicy(3, SMALL)
+    valid = valid_passwords(policy)
+    samples = Counter(policy.generate(len(valid) * 300))
+
+    # Every valid password shows up about 300 times (standard deviation ~17)
+    assert set(samples) == valid
+    assert 200 < min(samples.values()) and max(samples.values()) < 400
+
+
+def test_impossible_policies_are_rejected():
+    with pytest.raises(ValueError):
+        CharsetPolicy(1, SMALL)
+    with pytest.raises(ValueError):
+        CharsetPolicy(3, (CharClass("digits", "01", 1),), exclude=SIMILAR_CHARS)
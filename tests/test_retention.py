@@ -0,0 +1,73 @@
+"""Tests for chunked retention purges."""
+
+import pytest
+
+from app.database import PasswordDatabase, RetentionPolicy
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PasswordDatabase(str(tmp_path / "history.db"))
+    yield db
+    db.close()
+
+
+def add_dated(db, count, age_days):
+    with db.conn:
+        db.conn.executemany(
+            "INSERT INTO password_history (password_hash, length, created_at)"
+            " VALUES (?, 16, DATETIME('now', ?))",
+            [(f"{age_days}-{i}", f"-{age_days} days") for i in range(count)],
+        )
+
+
+def ids(db):
+    return [row["id"] for row in db.conn.execute("SELECT id FROM password_history ORDER BY id")]
+
+
+def test_max_age_removes_only_old_entries(db):
+    add_dated(db, 25, age_days=40)
+    add_dated(db, 5, age_days=1)
+
+    removed = db.apply_retention(RetentionPolicy(max_age_days=30), batch_size=4)
+
+    assert removed == 25
+    assert ids(db) == list(range(26, 31))
+    assert db.count_history() == 5
+
+
+def test_max_rows_keeps_the_newest_entries(db):
+    add_dated(db, 10, age_days=3)
+    add_dated(db, 10, age_days=2)
+
+    removed = db.apply_retention(RetentionPolicy(max_rows=7), batch_size=3)
+
+    assert removed == 13
+    assert ids(db) == list(range(14, 21))
+    assert db.apply_retention(RetentionPolicy(max_rows=7)) == 0
+
+
+def test_purges_run_in_batches(db):
+    add_dated(db, 10, age_days=40)
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+
+    assert db.apply_retention(RetentionPolicy(max_age_days=30), batch_size=4) == 10
+    db.conn.set_trace_callback(None)
+
+    # 4 + 4 + 2 rows, each in its own transaction; the short batch ends the purge
+    assert statements.count("COMMIT") == 3
+    assert db.count_history() == 0
+
+
+def test_incremental_vacuum_returns_pages(db):
+    db.vacuum(enable_incremental=True)
+    assert db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    db.add_passwords({"password_hash": "x" * 64, "length": 16, "description": "d" * 500} for _ in range(2000))
+    pages = db.conn.execute("PRAGMA page_count").fetchone()[0]
+
+    db.clear_history()
+
+    assert db.count_history() == 0
+    assert db.conn.execute("PRAGMA page_count").fetchone()[0] < pages
+    assert db.conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
@@ -0,0 +1,67 @@
+"""Tests for the vault search index."""
+
+import pytest
+
+from ciphersmith.search_index import SearchIndex
+from ciphersmith.storage import PasswordStorage
+
+ENTRIES = {
+    "GitHub": {"username": "octo", "url": "https://github.com", "notes": ""},
+    "GitLab": {"username": "me@corp", "url": "", "notes": "work git server"},
+    "Bank": {"username": "alice", "url": "https://bank.example", "notes": ""},
+}
+
+
+def services(results):
+    return [service for service, _ in results]
+
+
+def test_substring_is_case_insensitive_and_ranked():
+    index = SearchIndex(ENTRIES)
+
+    # Service-name prefixes outrank a match in the notes
+    assert services(index.search("GIT")) == ["GitHub", "GitLab"]
+    assert services(index.search("corp")) == ["GitLab"]
+
+
+def test_prefix_matches_word_starts_only():
+    index = SearchIndex(ENTRIES)
+
+    assert services(index.search("server", mode="prefix")) == ["GitLab"]
+    assert services(index.search("hub", mode="prefix")) == []
+    assert services(index.search("hub")) == ["GitHub"]
+
+
+def test_fuzzy_tolerates_typos():
+    index = SearchIndex(ENTRIES)
+
+    assert services(index.search("gitlba", mode="fuzzy")) == ["GitLab"]
+
+
+def test_fuzzy_finds_short_deletion_typos():
+    index = SearchIndex(ENTRIES)
+
+    assert services(index.search("gihub", mode="fuzzy")) == ["GitHub"]
+    assert services(index.search("githb", mode="fuzzy")) == ["GitHub"]
+    assert services(index.search("xyz", mode="fuzzy")) == []
+
+
+def test_short_queries_and_unknown_modes():
+    index = SearchIndex(ENTRIES)
+
+    assert set(services(index.search("a"))) == {"GitLab", "Bank"}
+    with pytest.raises(ValueError):
+        index.search("git", mode="regex")
+
+
+def test_storage_keeps_the_index_current(tmp_path):
+    storage = PasswordStorage(str(tmp_path / "vault.dat"), str(tmp_path / "master.key"))
+    storage.add_password("GitHub", "octo", "pw")
+    assert [r["service"] for r in storage.find_passwords("git")] == ["GitHub"]
+
+    storage.add_password("GitLab", "me", "pw")
+    storage.update_password("GitHub", username="renamed")
+    storage.delete_password("GitLab")
+
+    assert [r["service"] for r in storage.find_passwords("git")] == ["GitHub"]
+    assert [r["service"] for r in storage.find_passwords("renamed")] == ["GitHub"]
@@ -0,0 +1,63 @@
+"""Tests for the single-blob PasswordStorage vault."""
+
+import io
+import json
+
+import pytest
+
+from ciphersmith.storage import PasswordStorage, _read_json
+
+
+def open_storage(tmp_path):
+    return PasswordStorage(str(tmp_path / "vault.dat"), str(tmp_path / "master.key"))
+
+
+@pytest.mark.parametrize("damage", ["append", "truncate"])
+def test_damaged_vault_is_not_overwritten(tmp_path, damage):
+    open_storage(tmp_path).add_password("svc", "user", "secret")
+    vault = tmp_path / "vault.dat"
+    data = vault.read_bytes()
+    damaged = data + b"\x00" if damage == "append" else data[:-1]
+    vault.write_bytes(damaged)
+
+    with pytest.raises(ValueError):
+        open_storage(tmp_path)
+
+    assert vault.read_bytes() == damaged
+
+
+def test_empty_file_opens_as_empty_vault(tmp_path):
+    (tmp_path / "vault.dat").write_bytes(b"")
+
+    storage = open_storage(tmp_path)
+    storage.add_password("svc", "user", "secret")
+
+    assert open_storage(tmp_path).list_services() == ["svc"]
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_read_json_matches_json_loads(indent, chunk_size):
+    obj = {
+        f"svc {i}": {"password": 'p"w\\' * i, "history": [i, 1.5, None, True], "notes": "é"}
+        for i in range(20)
+    }
+    obj["count"] = 12345
+    for value in (obj, {}, [1, 2, {"a": "b"}], 42):
+        text = json.dumps(value, indent=indent)
+        assert _read_json(io.StringIO(text), chunk_size=chunk_size) == value
+
+
+@pytest.mark.parametrize("text", ['{"a": 1', '{"a" 1}', '{"a": 1,}', '{1: 2}', '{"a": 1} x', '{"a": 1 "b": 2}'])
+def test_read_json_rejects_malformed_objects(text):
+    with pytest.raises(ValueError):
+        _read_json(io.StringIO(text), chunk_size=3)
+
+
+def test_stream_vault_round_trip(tmp_path):
+    storage = open_storage(tmp_path)
+    for i in range(50):
+        storage.add_password(f"svc {i}", "user", f"secret {i}")
+
+    reopened = open_storage(tmp_path)
+    assert reopened.passwords == storage.passwords
@@ -0,0 +1,70 @@
+"""Tests for the segmented stream encryption format."""
+
+import io
+
+import pytest
+
+from ciphersmith.encryption import Encryptor
+
+
+def encrypt(encryptor, data, **kwargs):
+    out = io.BytesIO()
+    encryptor.encrypt_stream(io.BytesIO(data), out, **kwargs)
+    return out.getvalue()
+
+
+def decrypt(encryptor, blob):
+    out = io.BytesIO()
+    encryptor.decrypt_stream(io.BytesIO(blob), out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("cipher", ["aes-gcm", "chacha20-poly1305"])
+@pytest.mark.parametrize("size", [0, 1, 100, 101, 1000])
+def test_round_trip(cipher, size):
+    encryptor = Encryptor()
+    data = bytes(range(256)) * 4
+    data = data[:size]
+
+    assert decrypt(encryptor, encrypt(encryptor, data, cipher=cipher, segment_size=100)) == data
+
+
+def test_truncation_is_detected():
+    encryptor = Encryptor()
+    blob = encrypt(encryptor, b"x" * 1000, segment_size=100)
+
+    # Cut inside the last segment, and cleanly before it
+    for cut in (len(blob) - 1, len(blob) - (5 + 16)):
+        with pytest.raises(ValueError):
+            decrypt(encryptor, blob[:cut])
+
+
+def test_extension_is_detected():
+    encryptor = Encryptor()
+    blob = encrypt(encryptor, b"x" * 1000, segment_size=100)
+
+    with pytest.raises(ValueError, match="after the final segment"):
+        decrypt(encryptor, blob + b"GARBAGE")
+
+
+def test_tampering_and_wrong_key_are_detected():
+    encryptor = Encryptor()
+    blob = encrypt(encryptor, b"x" * 1000, segment_size=100)
+    tampered = blob[:30] + bytes([blob[30] ^ 1]) + blob[31:]
+
+    with pytest.raises(ValueError):
+        decrypt(encryptor, tampered)
+    with pytest.raises(ValueError):
+        decrypt(Encryptor(), blob)
+
+
+def test_interrupted_writer_leaves_a_truncated_stream():
+    encryptor = Encryptor()
+    out = io.BytesIO()
+    with pytest.raises(RuntimeError):
+        with encryptor.stream_writer(out) as writer:
+            writer.write(b"partial")
+            raise RuntimeError
+
+    with pytest.raises(ValueError, match="truncated"):
+        decrypt(encryptor, out.getvalue())
@@ -0,0 +1,49 @@
+"""Tests for converting blob and journal vaults to per-record storage."""
+
+import os
+
+from ciphersmith.journal_storage import JournalStorage
+from ciphersmith.record_storage import is_record_vault, open_vault
+from ciphersmith.storage import PasswordStorage
+
+
+def test_blob_vault_is_migrated(tmp_path):
+    vault, key = str(tmp_path / "vault.dat"), str(tmp_path / "master.key")
+    PasswordStorage(vault, key).add_password("svc", "user", "secret")
+
+    storage = open_vault(vault, key)
+
+    assert is_record_vault(vault)
+    assert storage.get_password("svc")["password"] == "secret"
+    assert os.path.exists(f"{vault}.bak")
+    storage.close()
+
+
+def test_journal_vault_keeps_journaled_entries(tmp_path):
+    vault, key = str(tmp_path / "vault.dat"), str(tmp_path / "master.key")
+    journal = JournalStorage(vault, key)
+    journal.add_password("svc", "user", "secret")
+    journal.update_password("svc", password="changed")
+    journal.close()
+
+    storage = open_vault(vault, key)
+
+    assert storage.get_password("svc")["history"] == ["secret", "changed"]
+    assert not os.path.exists(f"{vault}.journal")
+    assert os.path.exists(f"{vault}.journal.bak")
+    storage.close()
+
+
+def test_interrupted_compaction_is_replayed(tmp_path):
+    vault, key = str(tmp_path / "vault.dat"), str(tmp_path / "master.key")
+    journal = JournalStorage(vault, key)
+    journal.add_password("old", "user", "secret")
+    journal.close()
+    os.replace(f"{vault}.journal", f"{vault}.journal.compacting")
+
+    storage = open_vault(vault, key, lazy=True)
+
+    assert storage.list_services() == ["old"]
+    assert not os.path.exists(f"{vault}.journal.compacting")
+    assert not os.path.exists(f"{vault}.journal")
+    storage.close()
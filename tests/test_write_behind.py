@@ -0,0 +1,57 @@
+"""Tests for the write-behind history queue."""
+
+import hashlib
+
+import pytest
+
+from app.database import PasswordDatabase, WriteBehindQueue
+
+
+def entry(i):
+    return {
+        "password_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+        "length": 16,
+        "config": {},
+        "tags": ["bench"],
+    }
+
+
+def test_close_commits_queued_entries(tmp_path):
+    path = str(tmp_path / "history.db")
+    PasswordDatabase(path).close()
+    history = WriteBehindQueue(path, flush_interval=60)
+    for i in range(25):
+        history.put(entry(i))
+    history.close()
+
+    db = PasswordDatabase(path)
+    assert db.count_history() == 25
+    db.close()
+
+
+def test_flush_after_close_returns(tmp_path):
+    path = str(tmp_path / "history.db")
+    PasswordDatabase(path).close()
+    history = WriteBehindQueue(path)
+    history.put(entry(0))
+    history.close()
+
+    history.flush()
+    with pytest.raises(RuntimeError):
+        history.put(entry(1))
+
+
+def test_commit_error_is_sticky(tmp_path):
+    path = str(tmp_path / "history.db")
+    PasswordDatabase(path).close()
+    history = WriteBehindQueue(path)
+    history.put({"length": 16})  # no password_hash: the commit fails
+    with pytest.raises(Exception):
+        history.flush()
+
+    with pytest.raises(Exception):
+        history.flush()
+    with pytest.raises(Exception):
+        history.close()
+    with pytest.raises(Exception):
+        history.close()